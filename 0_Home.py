@@ -3,9 +3,11 @@ import pandas as pd
 from modules.utils import (
     set_page_config, 
     inject_custom_css, 
-    load_data, 
-    get_season_data, 
+    load_top_players,
+    select_season,
     METRIC_NAME_MAP,
+    RD_YL_GN,
+    gradient_css,
     initialize_session_state
 )
 
@@ -13,12 +15,11 @@ set_page_config()
 inject_custom_css()
 initialize_session_state()
 
-player_df, team_df = load_data()
-if player_df is None:
+selected_season = select_season()
+top_players = load_top_players(selected_season)
+if top_players is None:
     st.stop()
 
-player_df_season, team_df_season, selected_season = get_season_data(player_df, team_df)
-
 st.title("NBA Clutch Analytics Dashboard")
 st.markdown(f"### Analyzing Player and Team Performance Under Pressure for the **{selected_season}** Season")
 
@@ -38,8 +39,6 @@ st.markdown("---")
 st.header(f"Top 15 Clutch Players ({selected_season})")
 st.markdown(f"Ranked by the **{METRIC_NAME_MAP['CPI']}**, a composite metric measuring performance in high-pressure games (minimum 5 clutch games played for full calculation).")
 
-top_players = player_df_season[player_df_season['GP_clutch'] >= 5].nlargest(15, 'CPI')
-
 display_cols = {
     'PLAYER_NAME': 'Player',
     'TEAM_NAME': 'Team',
@@ -52,22 +51,14 @@ display_cols = {
 
 top_players_display = top_players[display_cols.keys()].rename(columns=display_cols)
 
-# Apply styling with fallback for deployment
-try:
-    styled_df = top_players_display.style.format({
-        'CPI': '{:.3f}', 
-        'Clutch FG%': '{:.1%}', 
-        'FG% Differential': '{:+.1%}'
-    }).background_gradient(cmap='Greens', subset=['CPI']).background_gradient(cmap='RdYlGn', subset=['FG% Differential'], vmin=-0.1, vmax=0.1).set_properties(**{'text-align': 'left'})
-except ImportError:
-    # Fallback styling without background_gradient if matplotlib is not available
-    styled_df = top_players_display.style.format({
-        'CPI': '{:.3f}', 
-        'Clutch FG%': '{:.1%}', 
-        'FG% Differential': '{:+.1%}'
-    }).set_properties(**{'text-align': 'left'})
+styled_df = top_players_display.style.format({
+    'CPI': '{:.3f}', 
+    'Clutch FG%': '{:.1%}', 
+    'FG% Differential': '{:+.1%}'
+}).apply(gradient_css, subset=['CPI']).apply(gradient_css, subset=['FG% Differential'], colors=RD_YL_GN, vmin=-0.1, vmax=0.1).set_properties(**{'text-align': 'left'})
 
 st.dataframe(
     styled_df,
-    width='stretch'
+    width='stretch',
+    hide_index=True
 )
\ No newline at end of file
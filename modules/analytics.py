@@ -1,10 +1,18 @@
 import pandas as pd
 import numpy as np
 
-def get_player_profile(df, player_name, season):
+def get_player_profile(df, player_name, season, row_index=None):
     """
     Retrieves a single player's data row as a dictionary (or Series).
+    If row_index (from utils.load_player_index) is given, the row is found by label
+    instead of scanning df.
     """
+    if row_index is not None:
+        label = row_index.get((player_name, season))
+        if label is None or label not in df.index:
+            return None
+        return df.loc[label]
+    
     try:
         player_data = df[
             (df['PLAYER_NAME'] == player_name) & 
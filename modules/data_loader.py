@@ -2,8 +2,11 @@
 
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
 import os
-from sklearn.preprocessing import StandardScaler
 
 # --- Configuration ---
 RAW_DATA_DIR = 'data/raw'
@@ -18,32 +21,85 @@ RAW_FILES = {
 }
 
 PROCESSED_FILES = {
-    'player': os.path.join(PROCESSED_DATA_DIR, 'player_performance.csv'),
-    'team': os.path.join(PROCESSED_DATA_DIR, 'team_performance.csv')
+    'team': os.path.join(PROCESSED_DATA_DIR, 'team_performance.parquet'),
+    # Full player table, as Arrow IPC for the Streamlit app's whole-table reads
+    'player_feather': os.path.join(PROCESSED_DATA_DIR, 'player_performance.feather'),
+    # Home page leaderboard, precomputed per season
+    'top15': os.path.join(PROCESSED_DATA_DIR, 'top15_by_season.parquet'),
+    # Hive-partitioned copy of the player table (SEASON=<year>/part-0.parquet) for per-season reads
+    'player_by_season': os.path.join(PROCESSED_DATA_DIR, 'player_performance_by_season')
 }
 
+# Columns shown in the Home page's Top 15 table (plus SEASON for filtering)
+TOP_PLAYER_COLS = ['SEASON', 'PLAYER_NAME', 'TEAM_NAME', 'CPI', 'GP_clutch', 'PPG_clutch', 'FG_PCT_clutch', 'FG_PCT_diff']
+
+# String columns stored dictionary-encoded (pandas category) in the Parquet output
+CATEGORICAL_COLS = ['PLAYER_NAME', 'TEAM_NAME']
+PARQUET_OPTIONS = dict(engine='pyarrow', compression='snappy', use_dictionary=True, row_group_size=50000)
+
+# Directory layout of the per-season player dataset: SEASON=<year>/
+SEASON_PARTITIONING = ds.partitioning(pa.schema([('SEASON', pa.int16())]), flavor='hive')
+
 # --- Helper Functions ---
 
-def convert_min_to_decimal(min_str):
-    """Converts 'MM:SS' or 'HH:MM:SS' string to decimal minutes."""
-    if pd.isna(min_str) or min_str in ['DNP', 'N/A', '']:
-        return 0.0
+def _parse_min_field(field):
+    """
+    Parses a Series of strings with float(). Returns the values and a mask of the
+    entries float() rejects; missing entries are NaN but not rejected.
+    """
+    values = np.full(len(field), np.nan)
+    rejected = np.zeros(len(field), dtype=bool)
+    for i, text in enumerate(field):
+        if pd.isna(text):
+            continue
+        try:
+            values[i] = float(text)
+        except ValueError:
+            rejected[i] = True
+    return values, rejected
+
+def convert_min_to_decimal(min_series):
+    """
+    Converts a Series of 'MM:SS' or 'HH:MM:SS' strings to decimal minutes.
+    Each ':'-separated field is read with float(); entries with one or more than
+    three fields use just the first. Missing, 'DNP' and unparseable entries become 0.
+    """
+    # ~600k rows hold only a few thousand distinct strings, so each is converted once
+    codes, uniques = pd.factorize(min_series)
+    parts = pd.Series(uniques, dtype='string').str.split(':', expand=True)
+    n_parts = parts.notna().sum(axis=1).to_numpy()
     
-    parts = str(min_str).split(':')
-    try:
-        if len(parts) == 2:
-            minutes = float(parts[0])
-            seconds = float(parts[1])
-            return minutes + (seconds / 60.0)
-        elif len(parts) == 3: # Handle 'HH:MM:SS' if present
-            hours = float(parts[0])
-            minutes = float(parts[1])
-            seconds = float(parts[2])
-            return (hours * 60) + minutes + (seconds / 60.0)
-        else: # Handle just minutes
-            return float(parts[0])
-    except ValueError:
-        return 0.0
+    # Only the first three fields are ever used
+    parts = parts.reindex(columns=range(3))
+    (first, first_bad), (second, second_bad), (third, third_bad) = (
+        _parse_min_field(parts[k]) for k in range(3)
+    )
+    
+    # Overflow and inf - inf quietly give inf/NaN, as plain float arithmetic does
+    with np.errstate(over='ignore', invalid='ignore'):
+        minutes = np.select(
+            [n_parts == 2, n_parts == 3],
+            [first + second / 60.0, (first * 60) + second + (third / 60.0)],
+            default=first
+        )
+    
+    # A rejected field in the formula used gives 0 minutes
+    rejected = first_bad | (np.isin(n_parts, [2, 3]) & second_bad) | ((n_parts == 3) & third_bad)
+    minutes = np.where(rejected, 0.0, minutes)
+    
+    # Code -1 (missing) picks the trailing 0
+    return pd.Series(np.append(minutes, 0.0)[codes], index=min_series.index)
+
+def zscore_weighted_sum(metrics, weights):
+    """
+    Z-scores each column of a float metrics matrix in place and returns the weighted row sums.
+    Zero-variance columns are only centred, matching StandardScaler.
+    """
+    metrics -= metrics.mean(axis=0)
+    std = metrics.std(axis=0)
+    std[std == 0] = 1.0
+    metrics /= std
+    return metrics @ weights
 
 def calculate_cpi(df, min_clutch_gp=5):
     """
@@ -56,10 +112,10 @@ def calculate_cpi(df, min_clutch_gp=5):
     df['CPI'] = np.nan
     
     # 1. Separate players into tiers based on clutch games played
-    high_volume = df[df['GP_clutch'] >= min_clutch_gp].copy()
-    low_volume = df[(df['GP_clutch'] > 0) & (df['GP_clutch'] < min_clutch_gp)].copy()
+    high_mask = df['GP_clutch'] >= min_clutch_gp
+    low_mask = (df['GP_clutch'] > 0) & (df['GP_clutch'] < min_clutch_gp)
     
-    if high_volume.empty and low_volume.empty:
+    if not high_mask.any() and not low_mask.any():
         df['CPI'] = 0.0
         return df
 
@@ -73,21 +129,14 @@ def calculate_cpi(df, min_clutch_gp=5):
     ]
     
     # 3. Calculate CPI for high-volume players (≥5 clutch games)
-    if not high_volume.empty:
-        # Handle potential infinite values from division by zero
-        high_volume.replace([np.inf, -np.inf], np.nan, inplace=True)
+    if high_mask.any():
+        # Only the metric columns are needed, as a contiguous float64 matrix
+        metrics_matrix = np.ascontiguousarray(df.loc[high_mask, metrics_to_scale].to_numpy(dtype=np.float64))
         
-        # Impute NaNs with the mean of the column for scaling
-        for col in metrics_to_scale:
-            if col not in high_volume.columns:
-                print(f"Warning: Metric {col} not found for CPI calculation.")
-                continue
-            high_volume[col] = high_volume[col].fillna(high_volume[col].mean())
-
-        # Scale the metrics (Z-Score)
-        scaler = StandardScaler()
-        scaled_metrics = scaler.fit_transform(high_volume[metrics_to_scale])
-        scaled_df = pd.DataFrame(scaled_metrics, columns=metrics_to_scale, index=high_volume.index)
+        # Handle potential infinite values from division by zero, then impute NaNs with the column means
+        metrics_matrix[~np.isfinite(metrics_matrix)] = np.nan
+        nan_rows, nan_cols = np.nonzero(np.isnan(metrics_matrix))
+        metrics_matrix[nan_rows, nan_cols] = np.nanmean(metrics_matrix, axis=0)[nan_cols]
 
         # Define weights
         weights = {
@@ -97,29 +146,21 @@ def calculate_cpi(df, min_clutch_gp=5):
             'TOPG_clutch': -0.15,  # Penalize turnovers
             'PLUS_MINUS_PER_GAME_clutch': 0.15
         }
+        weight_vector = np.array([weights[col] for col in metrics_to_scale], dtype=np.float64)
 
-        # Calculate CPI for high-volume players
-        cpi_high = (
-            scaled_df['PPG_clutch'] * weights['PPG_clutch'] +
-            scaled_df['FG_PCT_clutch'] * weights['FG_PCT_clutch'] +
-            scaled_df['APG_clutch'] * weights['APG_clutch'] +
-            scaled_df['TOPG_clutch'] * weights['TOPG_clutch'] +
-            scaled_df['PLUS_MINUS_PER_GAME_clutch'] * weights['PLUS_MINUS_PER_GAME_clutch']
-        )
+        # Scale the metrics (Z-Score) in place and apply the weights as one matvec
+        cpi_high = zscore_weighted_sum(metrics_matrix, weight_vector)
         
-        df.loc[high_volume.index, 'CPI'] = cpi_high
+        df.loc[high_mask, 'CPI'] = cpi_high
     
     # 4. Calculate adjusted CPI for low-volume players (<5 clutch games)
-    if not low_volume.empty:
+    if low_mask.any():
         # Use a simplified calculation based on raw performance metrics
         # Normalize each metric to 0-1 scale within low-volume group
-        low_volume_clean = low_volume.copy()
-        low_volume_clean.replace([np.inf, -np.inf], np.nan, inplace=True)
+        low_volume_clean = df.loc[low_mask, metrics_to_scale].replace([np.inf, -np.inf], np.nan)
         
         # Fill NaNs with group means
-        for col in metrics_to_scale:
-            if col in low_volume_clean.columns:
-                low_volume_clean[col] = low_volume_clean[col].fillna(low_volume_clean[col].mean())
+        low_volume_clean = low_volume_clean.fillna(low_volume_clean.mean())
         
         # Min-max normalization for low-volume players
         normalized_metrics = {}
@@ -133,7 +174,7 @@ def calculate_cpi(df, min_clutch_gp=5):
                     normalized_metrics[col] = 0.5  # Neutral score if all values are the same
         
         # Apply same weights but scale down by games played factor
-        games_factor = low_volume_clean['GP_clutch'] / min_clutch_gp  # Scale factor based on games played
+        games_factor = df.loc[low_mask, 'GP_clutch'] / min_clutch_gp  # Scale factor based on games played
         
         cpi_low = pd.Series(0.0, index=low_volume_clean.index)
         weights = {
@@ -161,6 +202,19 @@ def calculate_cpi(df, min_clutch_gp=5):
 
     return df
 
+def prepare_for_parquet(df):
+    """
+    Narrows key columns before writing: names become categories (Arrow dictionaries)
+    and SEASON a small integer, so the app reads typed columns with no parsing.
+    """
+    df = df.copy()
+    for col in CATEGORICAL_COLS:
+        if col in df.columns:
+            df[col] = df[col].astype('category').cat.remove_unused_categories()
+    # SEASON stays numeric: the model ranks it and the UI does arithmetic on it
+    df['SEASON'] = df['SEASON'].astype('int16')
+    return df
+
 # --- Main Processing Functions ---
 
 def process_player_data(games, details, teams):
@@ -174,9 +228,16 @@ def process_player_data(games, details, teams):
     stat_cols = ['FGM', 'FGA', 'FG3M', 'FG3A', 'FTM', 'FTA', 'OREB', 'DREB', 
                    'REB', 'AST', 'STL', 'BLK', 'TO', 'PF', 'PTS', 'PLUS_MINUS']
     
-    details[stat_cols] = details[stat_cols].fillna(0)
-    details[stat_cols] = details[stat_cols].astype(float)
-    details['MIN'] = details['MIN'].apply(convert_min_to_decimal)
+    # float32 halves the width of every column the merges and groupby scan;
+    # per-player season totals are small integers, exact in float32. MIN is
+    # fractional, so it stays float64 to keep its sums exactly as before
+    details[stat_cols] = details[stat_cols].fillna(0).astype(np.float32)
+    details['MIN'] = convert_min_to_decimal(details['MIN'])
+    
+    # All NBA game, team and player ids fit in int32
+    id_cols = ['GAME_ID', 'TEAM_ID', 'PLAYER_ID']
+    details[id_cols] = details[id_cols].astype(np.int32)
+    details['PLAYER_NAME'] = details['PLAYER_NAME'].astype('category')
     
     # Filter out players with 0 minutes, as they didn't play
     details = details[details['MIN'] > 0].copy()
@@ -185,14 +246,14 @@ def process_player_data(games, details, teams):
     print("  Merging datasets...")
     # Add GAME info (SEASON, IS_CLUTCH_GAME) to details
     details_merged = details.merge(
-        games[['GAME_ID', 'SEASON', 'IS_CLUTCH_GAME']], 
+        games[['GAME_ID', 'SEASON', 'IS_CLUTCH_GAME']].astype({'GAME_ID': np.int32, 'SEASON': np.int16, 'IS_CLUTCH_GAME': bool}), 
         on='GAME_ID',
         how='inner'
     )
     
     # Add TEAM info (TEAM_NAME) to details
     details_merged = details_merged.merge(
-        teams[['TEAM_ID', 'TEAM_NAME']], 
+        teams[['TEAM_ID', 'TEAM_NAME']].astype({'TEAM_ID': np.int32, 'TEAM_NAME': 'category'}), 
         on='TEAM_ID'
     )
 
@@ -200,37 +261,47 @@ def process_player_data(games, details, teams):
     print("  Aggregating player stats...")
     group_by_cols = ['PLAYER_ID', 'PLAYER_NAME', 'TEAM_NAME', 'SEASON', 'IS_CLUTCH_GAME']
     
-    agg_dict = {col: 'sum' for col in stat_cols + ['MIN']}
-    agg_dict['GAME_ID'] = 'count' # This will be our Games Played (GP)
+    # Names are categorical, so the hash groupby runs on integer codes; observed=True
+    # keeps it to the combinations that actually occur instead of their cartesian product
+    grouped = details_merged.groupby(group_by_cols, observed=True, sort=False)
     
-    player_agg = details_merged.groupby(group_by_cols).agg(agg_dict).reset_index()
-    player_agg = player_agg.rename(columns={'GAME_ID': 'GP', 'TO': 'TOV'}) # Rename 'TO' to avoid keyword clash
+    # One grouped sum over the whole stat block; group sizes are the Games Played (GP)
+    player_agg = grouped[stat_cols + ['MIN']].sum()
+    player_agg['GP'] = grouped.size()
+    player_agg = player_agg.reset_index().rename(columns={'TO': 'TOV'}) # Rename 'TO' to avoid keyword clash
 
     # Update stat_cols to reflect the renamed column
     pivot_stat_cols = [col if col != 'TO' else 'TOV' for col in stat_cols]
 
-    # 4. Pivot table
+    # 4. Split into clutch vs. non-clutch columns
     print("  Pivoting data to clutch vs. non-clutch...")
-    player_pivot = player_agg.pivot_table(
-        index=['PLAYER_ID', 'PLAYER_NAME', 'TEAM_NAME', 'SEASON'],
-        columns='IS_CLUTCH_GAME',
-        values=pivot_stat_cols + ['MIN', 'GP']
-    ).reset_index()
-
-    # Clean up multi-index columns
-    player_pivot.columns = [
-        f"{col[0]}_{'clutch' if col[1] else 'non_clutch'}" if isinstance(col[1], bool) else col[0] 
-        for col in player_pivot.columns
-    ]
+    index_cols = ['PLAYER_ID', 'PLAYER_NAME', 'TEAM_NAME', 'SEASON']
+    value_cols = pivot_stat_cols + ['MIN', 'GP']
+    
+    # Each (player, team, season, clutch) group has exactly one row, so a join
+    # of the two halves replaces pivot_table's MultiIndex build and renaming
+    is_clutch = player_agg['IS_CLUTCH_GAME']
+    clutch = player_agg.loc[is_clutch].set_index(index_cols)[value_cols].add_suffix('_clutch')
+    non_clutch = player_agg.loc[~is_clutch].set_index(index_cols)[value_cols].add_suffix('_non_clutch')
+    player_pivot = clutch.join(non_clutch, how='outer').reset_index()
     
     # Fill NaNs for players who *only* played in one type of game
     stat_cols_all = [f"{col}_{suffix}" for col in pivot_stat_cols + ['MIN', 'GP'] for suffix in ['clutch', 'non_clutch']]
-    player_pivot[stat_cols_all] = player_pivot[stat_cols_all].fillna(0)
+    # Widen back to float64 so the per-game stats, CPI and model inputs keep full precision
+    player_pivot[stat_cols_all] = player_pivot[stat_cols_all].fillna(0).astype(np.float64)
 
     # 5. Calculate final metrics
     print("  Calculating final per-game and efficiency metrics...")
     
     # Calculate per-game stats
+    per_game_stats = {'PPG': 'PTS', 'APG': 'AST', 'RPG': 'REB', 'TOPG': 'TOV', 'PLUS_MINUS_PER_GAME': 'PLUS_MINUS'}
+    ratio_stats = {
+        'FG_PCT': ('FGM', 'FGA'),
+        'FG3_PCT': ('FG3M', 'FG3A'),
+        'FT_PCT': ('FTM', 'FTA'),
+        'AST_TO_RATIO': ('AST', 'TOV')
+    }
+
     for suffix in ['clutch', 'non_clutch']:
         gp_col = f'GP_{suffix}'
         min_col = f'MIN_{suffix}'
@@ -239,17 +310,14 @@ def process_player_data(games, details, teams):
         player_pivot[gp_col] = player_pivot[gp_col].replace(0, 1) # Use 1 to avoid DivByZero, stats will be 0 anyway
         player_pivot[min_col] = player_pivot[min_col].replace(0, 1)
 
-        player_pivot[f'PPG_{suffix}'] = player_pivot[f'PTS_{suffix}'] / player_pivot[gp_col]
-        player_pivot[f'APG_{suffix}'] = player_pivot[f'AST_{suffix}'] / player_pivot[gp_col]
-        player_pivot[f'RPG_{suffix}'] = player_pivot[f'REB_{suffix}'] / player_pivot[gp_col]
-        player_pivot[f'TOPG_{suffix}'] = player_pivot[f'TOV_{suffix}'] / player_pivot[gp_col]
-        player_pivot[f'PLUS_MINUS_PER_GAME_{suffix}'] = player_pivot[f'PLUS_MINUS_{suffix}'] / player_pivot[gp_col]
-        
-        player_pivot[f'FG_PCT_{suffix}'] = player_pivot[f'FGM_{suffix}'] / player_pivot[f'FGA_{suffix}'].replace(0, 1)
-        player_pivot[f'FG3_PCT_{suffix}'] = player_pivot[f'FG3M_{suffix}'] / player_pivot[f'FG3A_{suffix}'].replace(0, 1)
-        player_pivot[f'FT_PCT_{suffix}'] = player_pivot[f'FTM_{suffix}'] / player_pivot[f'FTA_{suffix}'].replace(0, 1)
+        # Divide each block of totals in a single array op instead of one Series at a time
+        totals = player_pivot[[f'{col}_{suffix}' for col in per_game_stats.values()]].to_numpy()
+        games = player_pivot[[gp_col]].to_numpy()
+        player_pivot[[f'{stat}_{suffix}' for stat in per_game_stats]] = totals / games
         
-        player_pivot[f'AST_TO_RATIO_{suffix}'] = player_pivot[f'AST_{suffix}'] / player_pivot[f'TOV_{suffix}'].replace(0, 1)
+        makes = player_pivot[[f'{num}_{suffix}' for num, _ in ratio_stats.values()]].to_numpy()
+        attempts = player_pivot[[f'{den}_{suffix}' for _, den in ratio_stats.values()]].to_numpy()
+        player_pivot[[f'{stat}_{suffix}' for stat in ratio_stats]] = makes / np.where(attempts == 0, 1, attempts)
         
         # Re-set GP for players with 0 games to 0 (we set to 1 to avoid errors)
         player_pivot[gp_col] = np.where(player_pivot[f'MIN_{suffix}'] == 1, 0, player_pivot[gp_col])
@@ -272,36 +340,31 @@ def process_team_data(games, teams):
     """
     print("Processing team data...")
     
-    # Melt games data to get one row per team-game
-    games_home = games[['GAME_ID', 'SEASON', 'IS_CLUTCH_GAME', 'HOME_TEAM_ID', 'HOME_TEAM_WINS']]
-    games_visitor = games[['GAME_ID', 'SEASON', 'IS_CLUTCH_GAME', 'VISITOR_TEAM_ID', 'HOME_TEAM_WINS']]
+    clutch = games['IS_CLUTCH_GAME'].to_numpy(dtype=bool)
+    home_wins = games['HOME_TEAM_WINS'].to_numpy(dtype=np.float64)
     
-    games_home = games_home.rename(columns={'HOME_TEAM_ID': 'TEAM_ID', 'HOME_TEAM_WINS': 'WIN'})
-    games_visitor = games_visitor.rename(columns={'VISITOR_TEAM_ID': 'TEAM_ID', 'HOME_TEAM_WINS': 'WIN'})
-    games_visitor['WIN'] = 1 - games_visitor['WIN'] # Invert win for visitor
+    def side_totals(team_col, wins):
+        # Masked per-game counts, summed per team-season in one pass
+        counts = pd.DataFrame({
+            'TEAM_ID': games[team_col].to_numpy(),
+            'SEASON': games['SEASON'].to_numpy(),
+            'GP_non_clutch': (~clutch).astype(np.float64),
+            'GP_clutch': clutch.astype(np.float64),
+            'WINS_non_clutch': np.where(clutch, 0.0, wins),
+            'WINS_clutch': np.where(clutch, wins, 0.0),
+        })
+        return counts.groupby(['TEAM_ID', 'SEASON'], sort=False).sum()
     
-    team_games = pd.concat([games_home, games_visitor])
+    # Home and visitor totals (visitor wins are the inverse of home wins)
+    team_totals = side_totals('HOME_TEAM_ID', home_wins).add(
+        side_totals('VISITOR_TEAM_ID', 1 - home_wins), fill_value=0
+    ).sort_index()
     
-    # Aggregate stats
-    team_agg = team_games.groupby(['TEAM_ID', 'SEASON', 'IS_CLUTCH_GAME']).agg(
-        GP=('GAME_ID', 'count'),
-        WINS=('WIN', 'sum')
-    ).reset_index()
+    for suffix in ['non_clutch', 'clutch']:
+        gp = team_totals[f'GP_{suffix}']
+        team_totals[f'WIN_PCT_{suffix}'] = team_totals[f'WINS_{suffix}'] / gp.where(gp > 0)
     
-    team_agg['WIN_PCT'] = team_agg['WINS'] / team_agg['GP']
-    
-    # Pivot
-    team_pivot = team_agg.pivot_table(
-        index=['TEAM_ID', 'SEASON'],
-        columns='IS_CLUTCH_GAME',
-        values=['GP', 'WINS', 'WIN_PCT']
-    ).reset_index()
-    
-    # Clean columns
-    team_pivot.columns = [
-        f"{col[0]}_{'clutch' if col[1] else 'non_clutch'}" if isinstance(col[1], bool) else col[0] 
-        for col in team_pivot.columns
-    ]
+    team_pivot = team_totals.reset_index()
     
     # Add team names
     team_performance = team_pivot.merge(teams[['TEAM_ID', 'TEAM_NAME']], on='TEAM_ID')
@@ -311,6 +374,46 @@ def process_team_data(games, teams):
     
     return team_performance
 
+def build_top_players(player_performance, n=15, min_clutch_gp=5):
+    """
+    Builds the Home page leaderboard: the top-n players by CPI in each season
+    among players with at least min_clutch_gp clutch games.
+    """
+    eligible = player_performance[player_performance['GP_clutch'] >= min_clutch_gp]
+    top_players = (
+        eligible.sort_values('CPI', ascending=False, kind='stable')
+        .groupby('SEASON', sort=False)
+        .head(n)
+        .sort_values(['SEASON', 'CPI'], ascending=[True, False], kind='stable')
+    )
+    return top_players[TOP_PLAYER_COLS].reset_index(drop=True)
+
+def write_season_partitions(df, base_dir):
+    """
+    Writes df as a Hive-partitioned Parquet dataset with one directory per SEASON,
+    replacing any partitions left from a previous run. Row order within a season is kept.
+    Read it back with dictionary_columns=CATEGORICAL_COLS to get the categoricals again.
+    """
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    # Store the categoricals as plain strings so each file only dictionary-encodes its own season's names
+    for col in CATEGORICAL_COLS:
+        index = table.schema.get_field_index(col)
+        table = table.set_column(index, col, table.column(col).cast(pa.string()))
+    
+    # One file per season, written directly: ds.write_dataset's writer threads can
+    # abort the interpreter at exit, and a season only needs a single file anyway
+    seasons = table.column('SEASON')
+    for season in pc.unique(seasons):
+        # Hive directory name, as SEASON_PARTITIONING reads it back
+        season_dir = f"SEASON={season.as_py()}"
+        os.makedirs(os.path.join(base_dir, season_dir), exist_ok=True)
+        pq.write_table(
+            table.filter(pc.equal(seasons, season)).drop_columns('SEASON'),
+            os.path.join(base_dir, season_dir, 'part-0.parquet'),
+            compression='snappy',
+            use_dictionary=True
+        )
+
 def run_processing():
     """
     Main function to run the entire data processing pipeline.
@@ -350,12 +453,17 @@ def run_processing():
     # --- Save Processed Data ---
     try:
         print(f"Saving processed data to {PROCESSED_DATA_DIR}...")
-        player_performance.to_csv(PROCESSED_FILES['player'], index=False)
-        team_performance.to_csv(PROCESSED_FILES['team'], index=False)
+        player_performance = prepare_for_parquet(player_performance)
+        player_performance.reset_index(drop=True).to_feather(PROCESSED_FILES['player_feather'], compression='lz4')
+        prepare_for_parquet(team_performance).to_parquet(PROCESSED_FILES['team'], index=False, **PARQUET_OPTIONS)
+        prepare_for_parquet(build_top_players(player_performance)).to_parquet(PROCESSED_FILES['top15'], index=False, **PARQUET_OPTIONS)
+        write_season_partitions(player_performance, PROCESSED_FILES['player_by_season'])
         print("---")
         print("Data processing complete!")
-        print(f"Player data saved to: {PROCESSED_FILES['player']}")
+        print(f"Player data saved to: {PROCESSED_FILES['player_feather']}")
         print(f"Team data saved to: {PROCESSED_FILES['team']}")
+        print(f"Top players saved to: {PROCESSED_FILES['top15']}")
+        print(f"Per-season player data saved to: {PROCESSED_FILES['player_by_season']}")
         print("---")
     except IOError as e:
         print(f"Error saving processed files: {e}")
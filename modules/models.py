@@ -1,33 +1,46 @@
 import pandas as pd
 import numpy as np
+import hashlib
 from sklearn.model_selection import train_test_split, GridSearchCV
 from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
 from sklearn.linear_model import Ridge
 from sklearn.metrics import r2_score, mean_absolute_error
 from sklearn.preprocessing import StandardScaler, RobustScaler
 from sklearn.feature_selection import SelectKBest, f_regression
+from joblib import Parallel, delayed, cpu_count
 import streamlit as st
 
+def _previous_season(df, col, lag=1):
+    """
+    Returns col shifted down by lag rows of a frame sorted by player and season,
+    masked to NaN where the earlier row belongs to a different player.
+    Returned as float64, the precision pandas' rolling windows compute in.
+    """
+    same_player = df['PLAYER_ID'].eq(df['PLAYER_ID'].shift(lag))
+    return df[col].astype('float64').shift(lag).where(same_player)
+
 @st.cache_data
-def get_model_data(player_df):
+def _enhanced_features(player_df):
     """
-    Engineers enhanced features to predict next season's CPI based on the current season.
+    Sorts player seasons chronologically and adds the rolling, interaction and
+    experience features shared by model training and prediction.
     """
-    # Sort by player and season to ensure correct shifting
-    df = player_df.sort_values(by=['PLAYER_ID', 'SEASON'])
-    
-    # Enhanced feature engineering
-    base_features = [
-        'GP_clutch', 'PPG_clutch', 'FG_PCT_clutch', 'FG3_PCT_clutch', 
-        'AST_TO_RATIO_clutch', 'PLUS_MINUS_PER_GAME_clutch', 
-        'PPG_diff', 'FG_PCT_diff', 'GP_non_clutch', 'PPG_non_clutch',
-        'RPG_clutch', 'APG_clutch', 'TOPG_clutch'
-    ]
+    # Sort by player and season to ensure correct shifting. Traded players have
+    # one row per team in a season, so name and team break those ties to give a
+    # deterministic order whatever order the rows were stored in
+    # (stable lexsort; the last key is the primary one)
+    order = np.lexsort((
+        player_df['TEAM_NAME'].astype(str).to_numpy(),
+        player_df['PLAYER_NAME'].astype(str).to_numpy(),
+        player_df['SEASON'].to_numpy(),
+        player_df['PLAYER_ID'].to_numpy(),
+    ))
+    df = player_df.take(order)
     
     # Create rolling averages for stability (2-year rolling means)
-    df['CPI_2yr_avg'] = df.groupby('PLAYER_ID')['CPI'].rolling(2, min_periods=1).mean().reset_index(0, drop=True)
-    df['PPG_clutch_2yr_avg'] = df.groupby('PLAYER_ID')['PPG_clutch'].rolling(2, min_periods=1).mean().reset_index(0, drop=True)
-    df['FG_PCT_clutch_2yr_avg'] = df.groupby('PLAYER_ID')['FG_PCT_clutch'].rolling(2, min_periods=1).mean().reset_index(0, drop=True)
+    # Row-wise means skip NaN, matching rolling(2, min_periods=1) within each player
+    for col in ['CPI', 'PPG_clutch', 'FG_PCT_clutch']:
+        df[f'{col}_2yr_avg'] = pd.concat([df[col].astype('float64'), _previous_season(df, col)], axis=1).mean(axis=1)
     
     # Create interaction features
     df['PPG_times_FG_PCT'] = df['PPG_clutch'] * df['FG_PCT_clutch']
@@ -38,9 +51,32 @@ def get_model_data(player_df):
     df['experience'] = df.groupby('PLAYER_ID')['SEASON'].rank() - 1
     
     # Performance stability (coefficient of variation)
-    df['PPG_stability'] = df.groupby('PLAYER_ID')['PPG_clutch'].rolling(3, min_periods=2).std().reset_index(0, drop=True)
+    # Row-wise sample std over up to 3 seasons, NaN with fewer than 2 (rolling(3, min_periods=2))
+    ppg_window = pd.concat([
+        df['PPG_clutch'].astype('float64'),
+        _previous_season(df, 'PPG_clutch', 1),
+        _previous_season(df, 'PPG_clutch', 2)
+    ], axis=1)
+    df['PPG_stability'] = ppg_window.std(axis=1)
     df['PPG_stability'] = df['PPG_stability'].fillna(df['PPG_stability'].median())
     
+    return df
+
+@st.cache_data
+def get_model_data(player_df):
+    """
+    Engineers enhanced features to predict next season's CPI based on the current season.
+    """
+    df = _enhanced_features(player_df)
+    
+    # Enhanced feature set (engineered columns come from _enhanced_features)
+    base_features = [
+        'GP_clutch', 'PPG_clutch', 'FG_PCT_clutch', 'FG3_PCT_clutch', 
+        'AST_TO_RATIO_clutch', 'PLUS_MINUS_PER_GAME_clutch', 
+        'PPG_diff', 'FG_PCT_diff', 'GP_non_clutch', 'PPG_non_clutch',
+        'RPG_clutch', 'APG_clutch', 'TOPG_clutch'
+    ]
+    
     enhanced_features = base_features + [
         'CPI_2yr_avg', 'PPG_clutch_2yr_avg', 'FG_PCT_clutch_2yr_avg',
         'PPG_times_FG_PCT', 'Games_consistency', 'Clutch_volume',
@@ -72,6 +108,42 @@ def get_model_data(player_df):
     
     return X, y, enhanced_features, df_model
 
+def _fit_one(name, model, X_train, y_train, X_test):
+    """
+    Fits one ensemble member and returns it with its train and test predictions.
+    """
+    model.fit(X_train, y_train)
+    return name, model, model.predict(X_train), model.predict(X_test)
+
+def _model_version(X, y):
+    """
+    Content hash of the training features and target. The fit is seeded, so this
+    identifies the trained ensemble for the caches keyed on it.
+    """
+    digest = hashlib.sha1(','.join(X.columns).encode())
+    digest.update(pd.util.hash_pandas_object(X).to_numpy().tobytes())
+    digest.update(pd.util.hash_pandas_object(y).to_numpy().tobytes())
+    return digest.hexdigest()
+
+def _ensemble_importance(ensemble_model):
+    """
+    Ensemble-weighted feature importance over the selected features
+    (absolute coefficients for Ridge), or None if no model exposes one.
+    """
+    importances, weights = [], []
+    for name, model in ensemble_model['models'].items():
+        if hasattr(model, 'feature_importances_'):
+            importances.append(model.feature_importances_)
+        elif hasattr(model, 'coef_'):
+            importances.append(np.abs(model.coef_))
+        else:
+            continue
+        weights.append(ensemble_model['weights'][name])
+    
+    if not importances:
+        return None
+    return np.asarray(weights) @ np.vstack(importances)
+
 @st.cache_resource
 def train_model(X, y):
     """
@@ -81,8 +153,11 @@ def train_model(X, y):
         return None, None, None, None, None, None
         
     # Stratified split to ensure balanced training/test sets
+    # (5 equal-width target bins, the same labels pd.cut(y, bins=5) assigns)
+    y_values = y.to_numpy()
+    bin_edges = np.linspace(y_values.min(), y_values.max(), 6)[1:-1]
     X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.25, random_state=42, stratify=pd.cut(y, bins=5, labels=False)
+        X, y, test_size=0.25, random_state=42, stratify=np.digitize(y_values, bin_edges, right=True)
     )
     
     # Use RobustScaler to handle outliers better
@@ -95,6 +170,9 @@ def train_model(X, y):
     X_train_selected = selector.fit_transform(X_train_scaled, y_train)
     X_test_selected = selector.transform(X_test_scaled)
     
+    # The three models are fitted side by side, so RF gets its share of the cores
+    n_workers = min(3, cpu_count())
+    
     # Ensemble of models with hyperparameter tuning
     models = {
         'rf': RandomForestRegressor(
@@ -104,7 +182,7 @@ def train_model(X, y):
             min_samples_leaf=5,
             max_features='sqrt',
             random_state=42,
-            n_jobs=-1
+            n_jobs=max(1, cpu_count() // n_workers)
         ),
         'gbm': GradientBoostingRegressor(
             n_estimators=150,
@@ -121,14 +199,14 @@ def train_model(X, y):
     predictions_train = np.zeros(len(y_train))
     predictions_test = np.zeros(len(y_test))
     
-    for name, model in models.items():
-        model.fit(X_train_selected, y_train)
+    results = Parallel(n_jobs=n_workers)(
+        delayed(_fit_one)(name, model, X_train_selected, y_train, X_test_selected)
+        for name, model in models.items()
+    )
+    
+    for name, model, pred_train, pred_test in results:
         trained_models[name] = model
         
-        # Get predictions
-        pred_train = model.predict(X_train_selected)
-        pred_test = model.predict(X_test_selected)
-        
         # Ensemble weights (RF: 0.5, GBM: 0.3, Ridge: 0.2)
         weights = {'rf': 0.5, 'gbm': 0.3, 'ridge': 0.2}
         predictions_train += pred_train * weights[name]
@@ -148,38 +226,24 @@ def train_model(X, y):
         'selector': selector,
         'weights': {'rf': 0.5, 'gbm': 0.3, 'ridge': 0.2}
     }
+    ensemble_model['feature_importance'] = _ensemble_importance(ensemble_model)
+    ensemble_model['version'] = _model_version(X, y)
     
     return ensemble_model, scaler, test_r2, mae, train_r2, rmse
 
-def get_predictions(player_df, selected_season, ensemble_model, scaler, features):
+@st.cache_data(max_entries=32, show_spinner=False)
+def get_predictions(_player_df, selected_season, _ensemble_model, _scaler, features, model_version):
     """
     Generates predictions for all players from the selected season using the ensemble model.
+    The player frame, model and scaler are not hashed; model_version (the ensemble's
+    'version' from train_model) keys the cache instead, so _player_df must be the
+    frame the model was trained from.
     """
-    # Get all player data from the selected season
-    current_season_data = player_df[player_df['SEASON'] == selected_season].copy()
-    
-    # Re-engineer features for the current season data (same as in get_model_data)
-    df = player_df.sort_values(by=['PLAYER_ID', 'SEASON'])
-    
-    # Create rolling averages for stability (2-year rolling means)
-    df['CPI_2yr_avg'] = df.groupby('PLAYER_ID')['CPI'].rolling(2, min_periods=1).mean().reset_index(0, drop=True)
-    df['PPG_clutch_2yr_avg'] = df.groupby('PLAYER_ID')['PPG_clutch'].rolling(2, min_periods=1).mean().reset_index(0, drop=True)
-    df['FG_PCT_clutch_2yr_avg'] = df.groupby('PLAYER_ID')['FG_PCT_clutch'].rolling(2, min_periods=1).mean().reset_index(0, drop=True)
-    
-    # Create interaction features
-    df['PPG_times_FG_PCT'] = df['PPG_clutch'] * df['FG_PCT_clutch']
-    df['Games_consistency'] = df['GP_clutch'] / (df['GP_clutch'] + df['GP_non_clutch'])
-    df['Clutch_volume'] = df['GP_clutch'] * df['PPG_clutch']
-    
-    # Age proxy (years since first season)
-    df['experience'] = df.groupby('PLAYER_ID')['SEASON'].rank() - 1
-    
-    # Performance stability (coefficient of variation)
-    df['PPG_stability'] = df.groupby('PLAYER_ID')['PPG_clutch'].rolling(3, min_periods=2).std().reset_index(0, drop=True)
-    df['PPG_stability'] = df['PPG_stability'].fillna(df['PPG_stability'].median())
+    # Engineered features come from the same cached frame used for training
+    df = _enhanced_features(_player_df)
     
     # Get the enhanced data for the selected season
-    current_season_enhanced = df[df['SEASON'] == selected_season].copy()
+    current_season_enhanced = df[df['SEASON'] == selected_season]
     
     # Ensure data has all required features
     current_season_enhanced = current_season_enhanced.dropna(subset=features)
@@ -189,14 +253,14 @@ def get_predictions(player_df, selected_season, ensemble_model, scaler, features
         
     # Prepare data for prediction
     X_pred = current_season_enhanced[features]
-    X_pred_scaled = scaler.transform(X_pred)
-    X_pred_selected = ensemble_model['selector'].transform(X_pred_scaled)
+    X_pred_scaled = _scaler.transform(X_pred)
+    X_pred_selected = _ensemble_model['selector'].transform(X_pred_scaled)
     
     # Make ensemble predictions
     ensemble_predictions = np.zeros(len(X_pred))
-    for name, model in ensemble_model['models'].items():
+    for name, model in _ensemble_model['models'].items():
         pred = model.predict(X_pred_selected)
-        ensemble_predictions += pred * ensemble_model['weights'][name]
+        ensemble_predictions += pred * _ensemble_model['weights'][name]
     
     # Create a results dataframe
     results_df = current_season_enhanced[['PLAYER_NAME', 'TEAM_NAME']].copy()
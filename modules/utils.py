@@ -1,10 +1,56 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
+import pyarrow.dataset as ds
 import os
+from datetime import datetime
+from string import Template
+from modules.data_loader import SEASON_PARTITIONING
 
 # constants
-PLAYER_DATA_PATH = 'data/processed/player_performance.csv'
-TEAM_DATA_PATH = 'data/processed/team_performance.csv'
+PLAYER_FEATHER_PATH = 'data/processed/player_performance.feather'
+TEAM_DATA_PATH = 'data/processed/team_performance.parquet'
+TOP_PLAYERS_PATH = 'data/processed/top15_by_season.parquet'
+PLAYER_SEASONS_PATH = 'data/processed/player_performance_by_season'
+# string.Template HTML for the downloadable reports, resolved relative to the repo root
+REPORT_TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'templates')
+
+# Per-season player dataset (SEASON=<year>/, see data_loader); names are stored as plain strings
+SEASON_FORMAT = ds.ParquetFileFormat(
+    read_options=ds.ParquetReadOptions(dictionary_columns=['PLAYER_NAME', 'TEAM_NAME'])
+)
+
+# Player columns consumed by the pages, models and reports; only these are deserialized
+PLAYER_COLUMNS = [
+    'PLAYER_ID', 'PLAYER_NAME', 'TEAM_NAME', 'SEASON', 'CPI',
+    'GP_clutch', 'GP_non_clutch', 'PTS_clutch', 'FGA_clutch', 'TOV_clutch',
+    'PPG_clutch', 'PPG_non_clutch', 'APG_clutch', 'RPG_clutch', 'TOPG_clutch',
+    'FG_PCT_clutch', 'FG_PCT_non_clutch', 'FG3_PCT_clutch', 'FG3_PCT_non_clutch',
+    'AST_TO_RATIO_clutch', 'AST_TO_RATIO_non_clutch', 'PLUS_MINUS_PER_GAME_clutch',
+    'PPG_diff', 'FG_PCT_diff',
+]
+
+# Player fields rendered in the downloadable HTML reports, with their format() specs
+REPORT_FORMATS = {
+    'PLAYER_NAME': '',
+    'TEAM_NAME': '',
+    'CPI': '.3f',
+    'GP_clutch': '.0f',
+    'PPG_clutch': '.1f',
+    'FG_PCT_clutch': '.1%',
+    'PPG_diff': '+.1f',
+    'FG_PCT_diff': '+.1%',
+    'AST_TO_RATIO_clutch': '.2f',
+    'PLUS_MINUS_PER_GAME_clutch': '+.1f',
+}
+REPORT_COLS = list(REPORT_FORMATS)
+
+# Headline stats compared in the comparison report's Key Comparisons list
+KEY_COMPARISONS = [
+    ('Higher CPI', 'CPI'),
+    ('Better Clutch FG%', 'FG_PCT_clutch'),
+    ('Higher Clutch PPG', 'PPG_clutch'),
+]
 
 # Human-readable names for dataset column names
 METRIC_NAME_MAP = {
@@ -18,26 +64,124 @@ METRIC_NAME_MAP = {
     'FG_PCT_diff': 'FG% Differential (Clutch vs. Non-Clutch)',
 }
 
+# ColorBrewer anchors of matplotlib's Greens and RdYlGn colormaps, for table gradients
+GREENS = ('#f7fcf5', '#e5f5e0', '#c7e9c0', '#a1d99b', '#74c476', '#41ab5d', '#238b45', '#006d2c', '#00441b')
+RD_YL_GN = ('#a50026', '#d73027', '#f46d43', '#fdae61', '#fee08b', '#ffffbf', '#d9ef8b', '#a6d96a', '#66bd63', '#1a9850', '#006837')
+
 # --- Data Loading ---
-@st.cache_data
+@st.cache_data(ttl=3600)
 def load_data():
     """
     Loads and caches the processed player and team data.
     """
-    if not os.path.exists(PLAYER_DATA_PATH) or not os.path.exists(TEAM_DATA_PATH):
+    if not os.path.exists(PLAYER_FEATHER_PATH) or not os.path.exists(TEAM_DATA_PATH):
         st.error(f"Processed data not found! Please run `python modules/data_loader.py` first from your terminal.")
         return None, None
         
-    player_df = pd.read_csv(PLAYER_DATA_PATH)
-    team_df = pd.read_csv(TEAM_DATA_PATH)
-    
-    # Post-load cleaning - CPI should never be NaN with new calculation method
-    player_df['CPI'] = pd.to_numeric(player_df['CPI'], errors='coerce')
-    # Filter out players with 0 clutch games for a cleaner UI
-    player_df = player_df[player_df['GP_clutch'] > 0].copy()
+    # The Feather (Arrow IPC) copy decodes straight into Arrow buffers with column dtypes
+    # intact. Projection and the clutch-games filter are pushed into the scan, so players
+    # with 0 clutch games (dropped for a cleaner UI) are never materialized.
+    player_table = ds.dataset(PLAYER_FEATHER_PATH, format='feather').to_table(
+        columns=PLAYER_COLUMNS,
+        filter=ds.field('GP_clutch') > 0
+    )
+    player_df = player_table.to_pandas(self_destruct=True)
+    team_df = pd.read_parquet(TEAM_DATA_PATH, engine='pyarrow')
     
     return player_df, team_df
 
+@st.cache_data(ttl=3600)
+def load_top_players(season):
+    """
+    Loads the precomputed Top 15 clutch players for a season, ordered by CPI.
+    Only the selected season's rows are read from the Parquet file.
+    """
+    if season is None or not os.path.exists(TOP_PLAYERS_PATH):
+        st.error(f"Processed data not found! Please run `python modules/data_loader.py` first from your terminal.")
+        return None
+    return pd.read_parquet(TOP_PLAYERS_PATH, engine='pyarrow', filters=[('SEASON', '=', int(season))])
+
+@st.cache_data(ttl=3600)
+def list_seasons():
+    """
+    Returns the seasons in the per-season player dataset, newest first.
+    Seasons come from the partition directory names; no data is read.
+    """
+    if not os.path.exists(PLAYER_SEASONS_PATH):
+        return []
+    dataset = ds.dataset(PLAYER_SEASONS_PATH, format=SEASON_FORMAT, partitioning=SEASON_PARTITIONING)
+    seasons = {
+        ds.get_partition_keys(fragment.partition_expression)['SEASON']
+        for fragment in dataset.get_fragments()
+    }
+    return sorted(seasons, reverse=True)
+
+@st.cache_data(ttl=3600)
+def load_season_data(season):
+    """
+    Loads and caches the player and team data for a single season.
+    Only the season's partition of the player dataset is opened, and the team read is
+    filtered by season, so other seasons are never materialized.
+    """
+    if season is None or not os.path.exists(PLAYER_SEASONS_PATH) or not os.path.exists(TEAM_DATA_PATH):
+        st.error(f"Processed data not found! Please run `python modules/data_loader.py` first from your terminal.")
+        return None, None
+    
+    season = int(season)
+    player_dataset = ds.dataset(PLAYER_SEASONS_PATH, format=SEASON_FORMAT, partitioning=SEASON_PARTITIONING)
+    player_df_season = player_dataset.to_table(
+        columns=PLAYER_COLUMNS,
+        filter=(ds.field('SEASON') == season) & (ds.field('GP_clutch') > 0)
+    ).to_pandas(self_destruct=True)
+    team_df_season = pd.read_parquet(TEAM_DATA_PATH, engine='pyarrow', filters=[('SEASON', '=', season)])
+    
+    return player_df_season, team_df_season
+
+@st.cache_resource(ttl=3600)
+def load_player_index(season):
+    """
+    Maps (PLAYER_NAME, SEASON) to the row label of the player's first row in
+    load_season_data's player table, so profiles are a hash lookup.
+    """
+    player_df, _ = load_season_data(season)
+    if player_df is None:
+        return {}
+    keys = pd.MultiIndex.from_arrays([player_df['PLAYER_NAME'], player_df['SEASON']])
+    first = ~keys.duplicated()
+    return dict(zip(keys[first], player_df.index[first]))
+
+@st.cache_data(show_spinner=False)
+def list_players(season):
+    """
+    Returns a season's player names sorted for the dropdowns, and a dict of
+    each name's position in that list.
+    """
+    player_df, _ = load_season_data(season)
+    if player_df is None:
+        return [], {}
+    player_list = sorted(player_df['PLAYER_NAME'].unique())
+    return player_list, {name: i for i, name in enumerate(player_list)}
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def get_team_player_positions(_df, season):
+    """
+    Maps each team to the positions of its rows in a season's player table.
+    The table is fixed for a season, so the result is keyed on the season
+    instead of hashing the frame.
+    """
+    return _df.groupby('TEAM_NAME', observed=True).indices
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def get_league_ranks(_df, season, metrics):
+    """
+    Ranks every player in a season's ranking pool on all metrics at once
+    (rank 1 is best, ties share the lower rank), indexed by PLAYER_NAME with
+    a player's first row kept. The pool is fixed for a season, so the result
+    is keyed on the season instead of hashing the frame.
+    """
+    ranks = _df[list(metrics)].rank(ascending=False, method='min').set_axis(_df['PLAYER_NAME'])
+    return ranks[~ranks.index.duplicated()]
+
 # --- Page Setup and Styling ---
 def set_page_config():
     """
@@ -48,296 +192,111 @@ def set_page_config():
         layout="wide"
     )
 
+# Dark, high-contrast theme injected on every page (built once at import).
+# Kept compact, one rule per line: text colour comes from the p/span/div/label/li rule
+# rather than universal descendant selectors, so the browser restyles less on each rerun.
+_CSS = """<style>
+:root{--fg:#FFFFFF;--bg:#000000;--panel:#1A1A1A;--control:#333333;--edge:#555555;--nba-blue:#1D428A}
+header[data-testid="stHeader"]{background-color:var(--bg)!important;height:3rem!important}
+header[data-testid="stHeader"] a{color:var(--fg)!important}
+header[data-testid="stHeader"] button{background-color:var(--nba-blue)!important;color:var(--fg)!important;border:1px solid var(--fg)!important}
+header[data-testid="stHeader"] button:hover{background-color:var(--fg)!important;color:var(--bg)!important}
+header[data-testid="stHeader"] svg{fill:var(--fg)!important}
+.stApp,.main .block-container{background-color:var(--bg)!important;color:var(--fg)!important}
+h1,h2,h3,h4,h5,h6{font-weight:700!important;color:var(--fg)!important}
+p,span,div,label,li{color:var(--fg)!important}
+.stSidebar{background-color:var(--panel)!important;border-right:1px solid var(--control)!important}
+.stSidebar>div{background-color:var(--panel)!important}
+.stSidebar a{color:var(--fg)!important}
+.stSidebar .stPageLink-NavLink{color:var(--fg)!important;background-color:transparent!important}
+.stSidebar .stPageLink-NavLink:hover{color:var(--fg)!important;background-color:var(--control)!important}
+.stSelectbox div[data-baseweb="select"]{background-color:var(--control)!important;border:1px solid var(--edge)!important;color:var(--fg)!important}
+.stSelectbox div[data-baseweb="select"]>div{background-color:var(--control)!important}
+.stSelectbox div[data-baseweb="select"] input{color:var(--fg)!important}
+.stSelectbox div[data-baseweb="select"] svg{fill:var(--fg)!important}
+div[data-baseweb="popover"],div[data-baseweb="popover"] div[role="listbox"],div[data-baseweb="popover"] ul,div[data-baseweb="popover"] li{background-color:var(--control)!important}
+div[data-baseweb="popover"] li:hover{background-color:var(--edge)!important}
+.stButton button{background-color:var(--nba-blue)!important;color:var(--fg)!important;font-weight:700!important;border:none!important;border-radius:5px!important;padding:8px 16px!important}
+.stButton button:hover{background-color:var(--control)!important;color:var(--fg)!important}
+.stDownloadButton button{background-color:#28a745!important;color:var(--fg)!important;font-weight:700!important;border:none!important;border-radius:5px!important;padding:8px 16px!important}
+.stDownloadButton button:hover{background-color:#218838!important;color:var(--fg)!important}
+div[data-testid="metric-container"]{background-color:var(--panel)!important;border:1px solid var(--control)!important;border-radius:8px!important;padding:16px!important;color:var(--fg)!important}
+.stDataFrame{background-color:var(--panel)!important;border:1px solid var(--control)!important;border-radius:8px!important;color:var(--fg)!important}
+.stDataFrame thead tr th{background-color:var(--control)!important;color:var(--fg)!important}
+.stDataFrame tbody tr td{background-color:var(--panel)!important;color:var(--fg)!important}
+.stPlotlyChart{background-color:var(--panel)!important}
+.stPageLink-NavLink{color:#66B2FF!important;text-decoration:none!important}
+.stPageLink-NavLink:hover{color:var(--fg)!important}
+.stMarkdown,.stMarkdown a,.stMarkdown code{color:var(--fg)!important}
+.stSlider>div>div>div>div{background-color:var(--control)!important}
+.stTextInput>div>div>input{background-color:var(--control)!important;color:var(--fg)!important;border:1px solid var(--edge)!important}
+.stAlert{background-color:var(--panel)!important;border:1px solid var(--edge)!important;color:var(--fg)!important}
+</style>"""
+
 def inject_custom_css():
     """
     Injects custom CSS for a dark theme with high contrast.
+    Must run on every rerun: Streamlit drops elements a run does not re-emit.
     """
-    css = """
-    <style>
-        /* --- Top Navigation Bar --- */
-        header[data-testid="stHeader"] {
-            background-color: #000000 !important;
-            height: 3rem !important;
-        }
-        
-        header[data-testid="stHeader"] * {
-            color: #FFFFFF !important;
-        }
-        
-        /* Deploy button and menu */
-        header[data-testid="stHeader"] button {
-            background-color: #1D428A !important;
-            color: #FFFFFF !important;
-            border: 1px solid #FFFFFF !important;
-        }
-        
-        header[data-testid="stHeader"] button:hover {
-            background-color: #FFFFFF !important;
-            color: #000000 !important;
-        }
-        
-        /* Three dots menu */
-        header[data-testid="stHeader"] svg {
-            fill: #FFFFFF !important;
-        }
-        
-        /* --- Base Theme - BLACK BACKGROUND --- */
-        .stApp {
-            background-color: #000000 !important;
-            color: #FFFFFF !important;
-        }
-        
-        /* Main content */
-        .main .block-container {
-            background-color: #000000 !important;
-            color: #FFFFFF !important;
-        }
-        
-        /* Headers */
-        h1, h2, h3, h4, h5, h6 {
-            font-weight: 700 !important;
-            color: #FFFFFF !important;
-        }
-        
-        /* Regular text */
-        .main p, .main span:not([data-baseweb]), .main div:not([data-baseweb]) {
-            color: #FFFFFF !important;
-        }
-        
-        /* All text elements */
-        p, span, div, label {
-            color: #FFFFFF !important;
-        }
-        
-        /* --- Sidebar --- */
-        .stSidebar {
-            background-color: #1A1A1A !important;
-            border-right: 1px solid #333333 !important;
-        }
-        
-        .stSidebar > div {
-            background-color: #1A1A1A !important;
-        }
-        
-        .stSidebar * {
-            color: #FFFFFF !important;
-        }
-        
-        .stSidebar h1, .stSidebar h2, .stSidebar h3 {
-            color: #FFFFFF !important;
-            font-weight: 700 !important;
-        }
-        
-        .stSidebar label, .stSidebar span, .stSidebar p {
-            color: #FFFFFF !important;
-        }
-        
-        /* Sidebar navigation links */
-        .stSidebar .stPageLink-NavLink {
-            color: #FFFFFF !important;
-            background-color: transparent !important;
-        }
-        
-        .stSidebar .stPageLink-NavLink:hover {
-            color: #FFFFFF !important;
-            background-color: #333333 !important;
-        }
-        
-        /* --- Dropdowns and Controls --- */
-        .stSelectbox div[data-baseweb="select"] {
-            background-color: #333333 !important;
-            border: 1px solid #555555 !important;
-            color: #FFFFFF !important;
-        }
-        
-        .stSelectbox div[data-baseweb="select"] > div {
-            background-color: #333333 !important;
-            color: #FFFFFF !important;
-        }
-        
-        .stSelectbox div[data-baseweb="select"] span {
-            color: #FFFFFF !important;
-        }
-        
-        .stSelectbox div[data-baseweb="select"] * {
-            color: #FFFFFF !important;
-        }
-        
-        .stSelectbox label {
-            color: #FFFFFF !important;
-        }
-        
-        /* Dropdown arrow */
-        .stSelectbox div[data-baseweb="select"] svg {
-            fill: #FFFFFF !important;
-        }
-        
-        /* Dropdown menu styling */
-        div[data-baseweb="popover"] {
-            background-color: #333333 !important;
-        }
-        
-        div[data-baseweb="popover"] div[role="listbox"] {
-            background-color: #333333 !important;
-        }
-        
-        div[data-baseweb="popover"] ul {
-            background-color: #333333 !important;
-        }
-        
-        div[data-baseweb="popover"] li {
-            background-color: #333333 !important;
-            color: #FFFFFF !important;
-        }
-        
-        div[data-baseweb="popover"] li * {
-            color: #FFFFFF !important;
-        }
-        
-        div[data-baseweb="popover"] li:hover {
-            background-color: #555555 !important;
-            color: #FFFFFF !important;
-        }
-        
-        div[data-baseweb="popover"] li:hover * {
-            color: #FFFFFF !important;
-        
-        /* --- Buttons --- */
-        .stButton button {
-            background-color: #1D428A !important;
-            color: #FFFFFF !important;
-            font-weight: 700 !important;
-            border: none !important;
-            border-radius: 5px !important;
-            padding: 8px 16px !important;
-        }
-        
-        .stButton button:hover {
-            background-color: #333333 !important;
-            color: #FFFFFF !important;
-        }
-        
-        /* Download buttons */
-        .stDownloadButton button {
-            background-color: #28a745 !important;
-            color: #FFFFFF !important;
-            font-weight: 700 !important;
-            border: none !important;
-            border-radius: 5px !important;
-            padding: 8px 16px !important;
-        }
-        
-        .stDownloadButton button:hover {
-            background-color: #218838 !important;
-            color: #FFFFFF !important;
-        }
-        
-        /* --- Metric Cards --- */
-        div[data-testid="metric-container"] {
-            background-color: #1A1A1A !important;
-            border: 1px solid #333333 !important;
-            border-radius: 8px !important;
-            padding: 16px !important;
-            color: #FFFFFF !important;
-        }
-        
-        div[data-testid="metric-container"] * {
-            color: #FFFFFF !important;
-        }
-        
-        /* --- Dataframes --- */
-        .stDataFrame {
-            background-color: #1A1A1A !important;
-            border: 1px solid #333333 !important;
-            border-radius: 8px !important;
-            color: #FFFFFF !important;
-        }
-        
-        .stDataFrame * {
-            color: #FFFFFF !important;
-        }
-        
-        /* Dataframe headers */
-        .stDataFrame thead tr th {
-            background-color: #333333 !important;
-            color: #FFFFFF !important;
-        }
-        
-        /* Dataframe rows */
-        .stDataFrame tbody tr td {
-            background-color: #1A1A1A !important;
-            color: #FFFFFF !important;
-        }
-        
-        /* --- Plotly Charts --- */
-        .stPlotlyChart {
-            background-color: #1A1A1A !important;
-        }
-        
-        /* --- Links --- */
-        .stPageLink-NavLink {
-            color: #66B2FF !important;
-            text-decoration: none !important;
-        }
-        
-        .stPageLink-NavLink:hover {
-            color: #FFFFFF !important;
-        }
-        
-        /* --- Markdown content --- */
-        .stMarkdown {
-            color: #FFFFFF !important;
-        }
-        
-        .stMarkdown * {
-            color: #FFFFFF !important;
-        }
-        
-        /* --- Sliders --- */
-        .stSlider > div > div > div > div {
-            background-color: #333333 !important;
-        }
-        
-        .stSlider label {
-            color: #FFFFFF !important;
-        }
-        
-        /* --- Text Input --- */
-        .stTextInput > div > div > input {
-            background-color: #333333 !important;
-            color: #FFFFFF !important;
-            border: 1px solid #555555 !important;
-        }
-        
-        .stTextInput label {
-            color: #FFFFFF !important;
-        }
-        
-        /* --- Warnings and Info --- */
-        .stAlert {
-            background-color: #1A1A1A !important;
-            border: 1px solid #555555 !important;
-            color: #FFFFFF !important;
-        }
-        
-        .stAlert * {
-            color: #FFFFFF !important;
-        }
+    st.markdown(_CSS, unsafe_allow_html=True)
+
+@st.cache_resource(show_spinner=False)
+def _gradient_styles(colors, n=256):
+    """
+    Builds the cell styles of an n-step colormap evenly interpolated between
+    hex colors, the way matplotlib builds its lookup tables, plus a final
+    style for missing values. Dark backgrounds get light text.
+    """
+    anchors = np.array([[int(c[i:i + 2], 16) for i in (1, 3, 5)] for c in colors]) / 255
+    x = np.linspace(0, 1, len(colors))
+    xind = np.linspace(0, 1, n)
+    ind = np.searchsorted(x, xind)[1:-1]
+    distance = ((xind[1:-1] - x[ind - 1]) / (x[ind] - x[ind - 1]))[:, None]
+    lut = np.clip(np.vstack([anchors[:1], distance * (anchors[ind] - anchors[ind - 1]) + anchors[ind - 1], anchors[-1:]]), 0.0, 1.0)
+    lut = np.vstack([lut, np.zeros((1, 3))])
 
-    </style>
+    # W3C relative luminance decides the text color
+    linear = np.where(lut <= 0.04045, lut / 12.92, ((lut + 0.055) / 1.055) ** 2.4)
+    dark = linear @ np.array([0.2126, 0.7152, 0.0722]) < 0.408
+    return np.array([
+        f"background-color: #{''.join(format(round(v * 255), '02x') for v in rgb)};color: {'#f1f1f1' if is_dark else '#000000'};"
+        for rgb, is_dark in zip(lut.tolist(), dark)
+    ])
+
+def gradient_css(s, colors=GREENS, vmin=None, vmax=None):
+    """
+    Styler.apply function coloring a column along a gradient, a
+    matplotlib-free stand-in for Styler.background_gradient.
+    The range defaults to the column's min and max.
+    """
+    styles = _gradient_styles(colors)
+    n = len(styles) - 1
+    values = s.to_numpy(dtype=float, na_value=np.nan)
+    vmin = np.nanmin(values) if vmin is None else vmin
+    vmax = np.nanmax(values) if vmax is None else vmax
+    scaled = (values - vmin) / (vmax - vmin) * n if vmax != vmin else np.zeros_like(values)
+    idx = np.where(np.isnan(scaled), n, np.clip(scaled, 0, n - 1).astype(int))
+    return styles[idx].tolist()
+
+def select_season(seasons=None):
     """
-    st.markdown(css, unsafe_allow_html=True)
+    Displays the season selector in the sidebar and returns the selected season.
+    Defaults to every season with player data (see list_seasons).
+    """
+    st.sidebar.title("NBA Clutch Analytics")
+    
+    if seasons is None:
+        seasons = list_seasons()
+    return st.sidebar.selectbox("Select Season", seasons)
 
 def get_season_data(player_df, team_df):
     """
-    Gets unique seasons and displays the season selector in the sidebar.
+    Displays the season selector in the sidebar.
     Returns the filtered dataframes for the selected season.
     """
     
-    st.sidebar.title("NBA Clutch Analytics")
-    
-    seasons = sorted(player_df['SEASON'].unique(), reverse=True)
-    selected_season = st.sidebar.selectbox("Select Season", seasons)
+    # Seasons come from the cached partition listing, not a unique() pass over player_df
+    selected_season = select_season()
     
     player_df_season = player_df[player_df['SEASON'] == selected_season].copy()
     team_df_season = team_df[team_df['SEASON'] == selected_season].copy()
@@ -349,231 +308,118 @@ def initialize_session_state():
     if 'favorites' not in st.session_state:
         st.session_state.favorites = []
 
-def get_default_player_index(player_list, favorites=None):
+def get_default_player_index(player_list, favorites=None, name_index=None):
     """
     Returns the default player index for dropdowns.
     Priority: 1. Favorites (if provided), 2. LeBron James, 3. First player alphabetically
+    name_index (from list_players) maps names to their positions in player_list; when
+    given, it replaces the list scans.
     """
-    if favorites and len(favorites) > 0:
-        # If there are favorites and the first favorite is in the current season
-        if favorites[0] in player_list:
-            return player_list.index(favorites[0])
+    candidates = [favorites[0]] if favorites else []
+    candidates.append('LeBron James')
     
-    # Try LeBron James as default
-    if 'LeBron James' in player_list:
-        return player_list.index('LeBron James')
+    for name in candidates:
+        if name_index is not None:
+            if name in name_index:
+                return name_index[name]
+        elif name in player_list:
+            return player_list.index(name)
     
     # Fall back to first player
     return 0
 
-def generate_player_report_html(player_data, season, df_for_ranking=None, selected_metric='CPI'):
+def _load_report_template(name):
     """
-    Generates an HTML report for a single player's clutch performance.
+    Reads an HTML report template from the repo's templates/ directory.
     """
-    from datetime import datetime
-    
-    html_content = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>NBA Clutch Analytics Report - {player_data['PLAYER_NAME']}</title>
-        <style>
-            body {{ font-family: Arial, sans-serif; margin: 40px; background-color: #f5f5f5; }}
-            .header {{ background-color: #1D428A; color: white; padding: 20px; text-align: center; }}
-            .content {{ background-color: white; padding: 30px; margin: 20px 0; border-radius: 8px; }}
-            .stats-grid {{ display: grid; grid-template-columns: repeat(auto-fit, minmax(200px, 1fr)); gap: 20px; margin: 20px 0; }}
-            .stat-card {{ background-color: #f8f9fa; padding: 15px; border-radius: 8px; text-align: center; }}
-            .stat-value {{ font-size: 24px; font-weight: bold; color: #1D428A; }}
-            .stat-label {{ font-size: 14px; color: #666; }}
-            .comparison {{ background-color: #e8f4fd; padding: 15px; margin: 20px 0; border-radius: 8px; }}
-            .footer {{ text-align: center; color: #666; font-size: 12px; margin-top: 30px; }}
-        </style>
-    </head>
-    <body>
-        <div class="header">
-            <h1>NBA Clutch Analytics Report</h1>
-            <h2>{player_data['PLAYER_NAME']} ({player_data['TEAM_NAME']}) - {season} Season</h2>
-        </div>
-        
-        <div class="content">
-            <h3>Clutch Performance Overview</h3>
-            <div class="stats-grid">
-                <div class="stat-card">
-                    <div class="stat-value">{player_data['CPI']:.3f}</div>
-                    <div class="stat-label">Clutch Player Index</div>
-                </div>
-                <div class="stat-card">
-                    <div class="stat-value">{player_data['GP_clutch']:.0f}</div>
-                    <div class="stat-label">Clutch Games Played</div>
-                </div>
-                <div class="stat-card">
-                    <div class="stat-value">{player_data['PPG_clutch']:.1f}</div>
-                    <div class="stat-label">Clutch PPG</div>
-                </div>
-                <div class="stat-card">
-                    <div class="stat-value">{player_data['FG_PCT_clutch']:.1%}</div>
-                    <div class="stat-label">Clutch FG%</div>
-                </div>
-            </div>
-            
-            <h3>Clutch vs. Non-Clutch Comparison</h3>
-            <div class="stats-grid">
-                <div class="stat-card">
-                    <div class="stat-value">{player_data['PPG_diff']:+.1f}</div>
-                    <div class="stat-label">PPG Differential</div>
-                </div>
-                <div class="stat-card">
-                    <div class="stat-value">{player_data['FG_PCT_diff']:+.1%}</div>
-                    <div class="stat-label">FG% Differential</div>
-                </div>
-                <div class="stat-card">
-                    <div class="stat-value">{player_data['AST_TO_RATIO_clutch']:.2f}</div>
-                    <div class="stat-label">Clutch AST/TO Ratio</div>
-                </div>
-                <div class="stat-card">
-                    <div class="stat-value">{player_data['PLUS_MINUS_PER_GAME_clutch']:+.1f}</div>
-                    <div class="stat-label">Clutch +/- Per Game</div>
-                </div>
-            </div>
+    with open(os.path.join(REPORT_TEMPLATE_DIR, name), encoding='utf-8') as f:
+        return Template(f.read())
+
+# Stylesheet shared by both reports, filled into their <style> blocks once at import
+with open(os.path.join(REPORT_TEMPLATE_DIR, 'report.css'), encoding='utf-8') as _css_file:
+    _REPORT_CSS = _css_file.read().rstrip('\n')
+
+_PLAYER_REPORT_TMPL = Template(_load_report_template('player_report.html').safe_substitute(report_css=_REPORT_CSS))
+_RANKING_TMPL = _load_report_template('report_ranking.html')
+_COMPARISON_REPORT_TMPL = Template(_load_report_template('comparison_report.html').safe_substitute(report_css=_REPORT_CSS))
+_FOOTER_TMPL = _load_report_template('report_footer.html')
+
+def _report_fields(player_data, prefix=''):
     """
+    Formats a player's REPORT_FORMATS fields as template values named after the lowercased
+    column (e.g. FG_PCT_clutch -> fg_pct_clutch), optionally prefixed (p1_, p2_).
+    """
+    return {prefix + col.lower(): format(player_data[col], spec) for col, spec in REPORT_FORMATS.items()}
+
+def _report_footer():
+    """
+    Returns the closing markup shared by both reports, stamped with the current time.
+    """
+    return _FOOTER_TMPL.substitute(generated_on=datetime.now().strftime("%B %d, %Y at %I:%M %p"))
+
+@st.cache_data(ttl=3600, max_entries=256, show_spinner=False)
+def _player_report_body(player_values, season, ranking, selected_metric):
+    """
+    Builds the cached, timestamp-free part of a player report.
+    player_values holds the REPORT_COLS fields; ranking is (rank, total_players) or None.
+    """
+    fields = _report_fields(dict(zip(REPORT_COLS, player_values)))
+    html_content = _PLAYER_REPORT_TMPL.substitute(fields, season=season)
+    
+    if ranking is not None:
+        player_rank, total_players = ranking
+        html_content += _RANKING_TMPL.substitute(
+            player_name=fields['player_name'],
+            player_rank=player_rank,
+            total_players=total_players,
+            metric_name=METRIC_NAME_MAP.get(selected_metric, selected_metric)
+        )
     
+    return html_content
+
+def generate_player_report_html(player_data, season, df_for_ranking=None, selected_metric='CPI'):
+    """
+    Generates an HTML report for a single player's clutch performance.
+    The body is cached per player, season and ranking; only the footer timestamp is rebuilt.
+    """
+    ranking = None
     if df_for_ranking is not None:
-        df_for_ranking['Rank'] = df_for_ranking[selected_metric].rank(ascending=False, method='min')
-        player_rank_series = df_for_ranking[df_for_ranking['PLAYER_NAME'] == player_data['PLAYER_NAME']]['Rank']
+        # Rank as rank(ascending=False, method='min') would: 1 + the number of strictly better values
+        values = df_for_ranking[selected_metric].to_numpy()
+        is_player = (df_for_ranking['PLAYER_NAME'] == player_data['PLAYER_NAME']).to_numpy()
         
-        if not player_rank_series.empty:
-            player_rank = int(player_rank_series.values[0])
-            total_players = len(df_for_ranking)
-            html_content += f"""
-            <div class="comparison">
-                <h3>League Ranking</h3>
-                <p><strong>{player_data['PLAYER_NAME']}</strong> ranks <strong>#{player_rank}</strong> out of {total_players} players 
-                in {METRIC_NAME_MAP.get(selected_metric, selected_metric)} (minimum 10 clutch games played).</p>
-            </div>
-            """
+        if is_player.any() and not np.isnan(values[is_player][0]):
+            ranking = (int((values > values[is_player][0]).sum()) + 1, len(values))
     
-    html_content += f"""
-        </div>
-        
-        <div class="footer">
-            Report generated on {datetime.now().strftime("%B %d, %Y at %I:%M %p")}<br>
-            NBA Clutch Analytics Dashboard
-        </div>
-    </body>
-    </html>
+    player_values = tuple(player_data[col] for col in REPORT_COLS)
+    return _player_report_body(player_values, season, ranking, selected_metric) + _report_footer()
+
+@st.cache_data(ttl=3600, max_entries=256, show_spinner=False)
+def _comparison_report_body(p1_values, p2_values, season):
     """
+    Builds the cached, timestamp-free part of a comparison report from REPORT_COLS values.
+    """
+    p1_data = dict(zip(REPORT_COLS, p1_values))
+    p2_data = dict(zip(REPORT_COLS, p2_values))
+    fields = {**_report_fields(p1_data, 'p1_'), **_report_fields(p2_data, 'p2_')}
     
-    return html_content
+    # Key comparisons: the leading player and both values for each headline stat
+    items = []
+    for label, col in KEY_COMPARISONS:
+        spec = REPORT_FORMATS[col]
+        a, b = p1_data[col], p2_data[col]
+        leader = p1_data['PLAYER_NAME'] if a > b else p2_data['PLAYER_NAME']
+        high, low = (b if b > a else a), (b if b < a else a)
+        items.append(f'<li><strong>{label}:</strong> {leader} ({format(high, spec)} vs {format(low, spec)})</li>')
+    fields['key_comparisons'] = '\n                '.join(items)
+    
+    return _COMPARISON_REPORT_TMPL.substitute(fields, season=season)
 
 def generate_comparison_report_html(p1_data, p2_data, season):
     """
     Generates an HTML report comparing two players' clutch performance.
+    The body is cached per player pair and season; only the footer timestamp is rebuilt.
     """
-    from datetime import datetime
-    
-    html_content = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>NBA Clutch Analytics Comparison - {p1_data['PLAYER_NAME']} vs {p2_data['PLAYER_NAME']}</title>
-        <style>
-            body {{ font-family: Arial, sans-serif; margin: 40px; background-color: #f5f5f5; }}
-            .header {{ background-color: #1D428A; color: white; padding: 20px; text-align: center; }}
-            .content {{ background-color: white; padding: 30px; margin: 20px 0; border-radius: 8px; }}
-            .comparison-grid {{ display: grid; grid-template-columns: 1fr 1fr; gap: 30px; margin: 20px 0; }}
-            .player-section {{ border: 2px solid #1D428A; border-radius: 8px; padding: 20px; }}
-            .player-name {{ color: #1D428A; font-size: 20px; font-weight: bold; margin-bottom: 15px; }}
-            .stats-grid {{ display: grid; grid-template-columns: repeat(auto-fit, minmax(150px, 1fr)); gap: 15px; }}
-            .stat-card {{ background-color: #f8f9fa; padding: 12px; border-radius: 6px; text-align: center; }}
-            .stat-value {{ font-size: 18px; font-weight: bold; color: #1D428A; }}
-            .stat-label {{ font-size: 12px; color: #666; }}
-            .winner {{ background-color: #d4edda; border-color: #c3e6cb; }}
-            .footer {{ text-align: center; color: #666; font-size: 12px; margin-top: 30px; }}
-        </style>
-    </head>
-    <body>
-        <div class="header">
-            <h1>NBA Clutch Analytics Comparison Report</h1>
-            <h2>{p1_data['PLAYER_NAME']} vs {p2_data['PLAYER_NAME']} - {season} Season</h2>
-        </div>
-        
-        <div class="content">
-            <div class="comparison-grid">
-                <div class="player-section">
-                    <div class="player-name">{p1_data['PLAYER_NAME']} ({p1_data['TEAM_NAME']})</div>
-                    <div class="stats-grid">
-                        <div class="stat-card">
-                            <div class="stat-value">{p1_data['CPI']:.3f}</div>
-                            <div class="stat-label">CPI</div>
-                        </div>
-                        <div class="stat-card">
-                            <div class="stat-value">{p1_data['GP_clutch']:.0f}</div>
-                            <div class="stat-label">Clutch GP</div>
-                        </div>
-                        <div class="stat-card">
-                            <div class="stat-value">{p1_data['PPG_clutch']:.1f}</div>
-                            <div class="stat-label">Clutch PPG</div>
-                        </div>
-                        <div class="stat-card">
-                            <div class="stat-value">{p1_data['FG_PCT_clutch']:.1%}</div>
-                            <div class="stat-label">Clutch FG%</div>
-                        </div>
-                        <div class="stat-card">
-                            <div class="stat-value">{p1_data['FG_PCT_diff']:+.1%}</div>
-                            <div class="stat-label">FG% Diff</div>
-                        </div>
-                        <div class="stat-card">
-                            <div class="stat-value">{p1_data['AST_TO_RATIO_clutch']:.2f}</div>
-                            <div class="stat-label">AST/TO</div>
-                        </div>
-                    </div>
-                </div>
-                
-                <div class="player-section">
-                    <div class="player-name">{p2_data['PLAYER_NAME']} ({p2_data['TEAM_NAME']})</div>
-                    <div class="stats-grid">
-                        <div class="stat-card">
-                            <div class="stat-value">{p2_data['CPI']:.3f}</div>
-                            <div class="stat-label">CPI</div>
-                        </div>
-                        <div class="stat-card">
-                            <div class="stat-value">{p2_data['GP_clutch']:.0f}</div>
-                            <div class="stat-label">Clutch GP</div>
-                        </div>
-                        <div class="stat-card">
-                            <div class="stat-value">{p2_data['PPG_clutch']:.1f}</div>
-                            <div class="stat-label">Clutch PPG</div>
-                        </div>
-                        <div class="stat-card">
-                            <div class="stat-value">{p2_data['FG_PCT_clutch']:.1%}</div>
-                            <div class="stat-label">Clutch FG%</div>
-                        </div>
-                        <div class="stat-card">
-                            <div class="stat-value">{p2_data['FG_PCT_diff']:+.1%}</div>
-                            <div class="stat-label">FG% Diff</div>
-                        </div>
-                        <div class="stat-card">
-                            <div class="stat-value">{p2_data['AST_TO_RATIO_clutch']:.2f}</div>
-                            <div class="stat-label">AST/TO</div>
-                        </div>
-                    </div>
-                </div>
-            </div>
-            
-            <h3>Key Comparisons</h3>
-            <ul>
-                <li><strong>Higher CPI:</strong> {p1_data['PLAYER_NAME'] if p1_data['CPI'] > p2_data['CPI'] else p2_data['PLAYER_NAME']} ({max(p1_data['CPI'], p2_data['CPI']):.3f} vs {min(p1_data['CPI'], p2_data['CPI']):.3f})</li>
-                <li><strong>Better Clutch FG%:</strong> {p1_data['PLAYER_NAME'] if p1_data['FG_PCT_clutch'] > p2_data['FG_PCT_clutch'] else p2_data['PLAYER_NAME']} ({max(p1_data['FG_PCT_clutch'], p2_data['FG_PCT_clutch']):.1%} vs {min(p1_data['FG_PCT_clutch'], p2_data['FG_PCT_clutch']):.1%})</li>
-                <li><strong>Higher Clutch PPG:</strong> {p1_data['PLAYER_NAME'] if p1_data['PPG_clutch'] > p2_data['PPG_clutch'] else p2_data['PLAYER_NAME']} ({max(p1_data['PPG_clutch'], p2_data['PPG_clutch']):.1f} vs {min(p1_data['PPG_clutch'], p2_data['PPG_clutch']):.1f})</li>
-            </ul>
-        </div>
-        
-        <div class="footer">
-            Report generated on {datetime.now().strftime("%B %d, %Y at %I:%M %p")}<br>
-            NBA Clutch Analytics Dashboard
-        </div>
-    </body>
-    </html>
-    """
-    
-    return html_content
\ No newline at end of file
+    p1_values = tuple(p1_data[col] for col in REPORT_COLS)
+    p2_values = tuple(p2_data[col] for col in REPORT_COLS)
+    return _comparison_report_body(p1_values, p2_values, season) + _report_footer()
@@ -1,8 +1,8 @@
 # Save this file as modules/visualizations.py
 
 import plotly.graph_objects as go
-import plotly.express as px
-import pandas as pd
+import numpy as np
+import streamlit as st
 from modules.utils import METRIC_NAME_MAP
 
 # --- Plotting Theme ---
@@ -11,6 +11,12 @@ NBA_BLUE = "#1D428A"
 NBA_RED = "#C8102E"
 NBA_GRAY = "#6C6D6F"
 
+# Figures are memoized on their inputs so reruns with unchanged selections skip
+# the Plotly build. cache_resource hands back the stored figure itself (a
+# cache_data hit would unpickle and re-validate it, costing as much as a fresh
+# build); the pages only pass figures to st.plotly_chart and never modify them.
+cache_figure = st.cache_resource(max_entries=256, show_spinner=False)
+
 def _format_fig(fig, title):
     """Helper to apply standard layout updates."""
     fig.update_layout(
@@ -24,6 +30,7 @@ def _format_fig(fig, title):
     )
     return fig
 
+@cache_figure
 def plot_player_kpis(player_data, compare_data=None):
     """
     Creates a set of bullet charts (styled as metrics) for a player's
@@ -37,35 +44,38 @@ def plot_player_kpis(player_data, compare_data=None):
         ('AST/TO', 'AST_TO_RATIO_clutch', 'AST_TO_RATIO_non_clutch'),
     ]
 
-    fig = go.Figure()
-    
     num_metrics = len(metrics)
     has_compare = compare_data is not None
+    traces = []
+    
+    # Pull every clutch/non-clutch pair in one reindex; absent columns read as 0
+    metric_cols = [col for _, clutch_col, non_clutch_col in metrics for col in (clutch_col, non_clutch_col)]
+    values = player_data.reindex(metric_cols, fill_value=0).to_numpy()
+    values_p2 = compare_data.reindex(metric_cols, fill_value=0).to_numpy() if has_compare else np.zeros(len(metric_cols))
     
     for i, (label, clutch_col, non_clutch_col) in enumerate(metrics):
         # --- Player 1 (Main) ---
-        clutch_val = player_data.get(clutch_col, 0)
-        non_clutch_val = player_data.get(non_clutch_col, 0)
+        clutch_val, non_clutch_val = values[2 * i], values[2 * i + 1]
         
         # --- Player 2 (Compare) ---
-        clutch_val_p2 = compare_data.get(clutch_col, 0) if has_compare else 0
-        non_clutch_val_p2 = compare_data.get(non_clutch_col, 0) if has_compare else 0
+        clutch_val_p2, non_clutch_val_p2 = values_p2[2 * i], values_p2[2 * i + 1]
         
         # Determine a reasonable max for the gauge
         gauge_max = max(clutch_val, non_clutch_val, clutch_val_p2, non_clutch_val_p2) * 1.5
         if gauge_max == 0:
             gauge_max = 1.0 if '%' in label else 10.0 # Default max
 
-        # Add Player 1's Trace
-        fig.add_trace(go.Indicator(
-            mode="number+gauge+delta",
-            value=clutch_val,
-            delta={'reference': non_clutch_val, 'relative': False, 
-                   'valueformat': '.3f' if '%' in label else '.2f'},
-            domain={'row': 0, 'column': i},
-            title={'text': f"<b>{label}</b><br>(vs. Non-Clutch)"},
-            number={'valueformat': '.3f' if '%' in label else '.2f'},
-            gauge={
+        # Player 1's Trace
+        traces.append({
+            'type': "indicator",
+            'mode': "number+gauge+delta",
+            'value': clutch_val,
+            'delta': {'reference': non_clutch_val, 'relative': False, 
+                      'valueformat': '.3f' if '%' in label else '.2f'},
+            'domain': {'row': 0, 'column': i},
+            'title': {'text': f"<b>{label}</b><br>(vs. Non-Clutch)"},
+            'number': {'valueformat': '.3f' if '%' in label else '.2f'},
+            'gauge': {
                 'shape': "bullet",
                 'axis': {'range': [0, gauge_max]},
                 'threshold': { # Non-Clutch value
@@ -75,15 +85,16 @@ def plot_player_kpis(player_data, compare_data=None):
                 },
                 'bar': {'color': NBA_BLUE} # Clutch value
             }
-        ))
+        })
         
-        # Add Player 2's Trace (if applicable)
+        # Player 2's Trace (if applicable)
         if has_compare:
-            fig.add_trace(go.Indicator(
-                mode="gauge", # No number or delta for P2
-                value=clutch_val_p2,
-                domain={'row': 1, 'column': i},
-                gauge={
+            traces.append({
+                'type': "indicator",
+                'mode': "gauge", # No number or delta for P2
+                'value': clutch_val_p2,
+                'domain': {'row': 1, 'column': i},
+                'gauge': {
                     'shape': "bullet",
                     'axis': {'range': [0, gauge_max]},
                     'threshold': { # Non-Clutch value
@@ -93,38 +104,60 @@ def plot_player_kpis(player_data, compare_data=None):
                     },
                     'bar': {'color': NBA_RED} # Clutch value
                 }
-            ))
+            })
 
-    # Define the grid layout
+    # Build the figure once, with the grid layout, instead of
+    # validating it trace by trace
     rows = 2 if has_compare else 1
-    fig.update_layout(
-        grid={'rows': rows, 'columns': num_metrics, 'pattern': "independent"},
-        template=PLOT_TEMPLATE,
-        height=150 * rows,
-        margin=dict(l=20, r=20, t=40, b=20)
+    return go.Figure(
+        data=traces,
+        layout={
+            'grid': {'rows': rows, 'columns': num_metrics, 'pattern': "independent"},
+            'template': PLOT_TEMPLATE,
+            'height': 150 * rows,
+            'margin': dict(l=20, r=20, t=40, b=20)
+        }
     )
-    return fig
 
-def plot_league_distribution(df, player_data, metric_col):
+@st.cache_data(max_entries=256, show_spinner=False)
+def get_league_distribution(_df, season, metric_col, nbins=50):
+    """
+    Bins a season's league distribution for a metric, dropping the extreme
+    1% at either end. The frame is the same for every call in a season, so
+    the result is keyed on the season instead of hashing the frame.
+    """
+    values = _df[metric_col].to_numpy(dtype=float)
+    q_low, q_high = np.nanpercentile(values, [1, 99])
+    values = values[(values > q_low) & (values < q_high)]
+    counts, edges = np.histogram(values, bins=nbins)
+    return q_low, q_high, edges, counts
+
+@cache_figure
+def plot_league_distribution(_df, season, player_data, metric_col):
     """
     Plots a histogram of the league distribution for a given metric
     and highlights the selected player's position.
     """
     metric_label = METRIC_NAME_MAP.get(metric_col, metric_col)
     
-    if player_data is None or metric_col not in df.columns:
+    if player_data is None or metric_col not in _df.columns:
         return go.Figure().update_layout(title="Metric not found.")
 
-    # Filter out extreme outliers for a better plot
-    q_low = df[metric_col].quantile(0.01)
-    q_high = df[metric_col].quantile(0.99)
-    df_filtered = df[(df[metric_col] > q_low) & (df[metric_col] < q_high)]
+    # Outliers are filtered out of the precomputed bins for a better plot
+    _, _, edges, counts = get_league_distribution(_df, season, metric_col)
     
     player_value = player_data.get(metric_col, 0)
     player_name = player_data.get('PLAYER_NAME', 'Selected Player')
     
-    fig = px.histogram(df_filtered, x=metric_col, nbins=50, 
-                       opacity=0.7, color_discrete_sequence=[NBA_BLUE])
+    fig = go.Figure(go.Bar(
+        x=(edges[:-1] + edges[1:]) / 2,
+        y=counts,
+        width=np.diff(edges),
+        customdata=np.column_stack([edges[:-1], edges[1:]]),
+        hovertemplate=f"{metric_col}=%{{customdata[0]:.3f}} - %{{customdata[1]:.3f}}<br>count=%{{y}}<extra></extra>",
+        opacity=0.7,
+        marker_color=NBA_BLUE
+    ))
     
     fig.add_vline(
         x=player_value, 
@@ -137,9 +170,10 @@ def plot_league_distribution(df, player_data, metric_col):
     )
     
     fig = _format_fig(fig, f"League Distribution: {metric_label}")
-    fig.update_layout(showlegend=False, yaxis_title="Player Count", xaxis_title=metric_label)
+    fig.update_layout(showlegend=False, bargap=0, yaxis_title="Player Count", xaxis_title=metric_label)
     return fig
 
+@cache_figure
 def plot_team_win_pct(team_data):
     """
     Compares a team's win percentage in clutch vs. non-clutch games.
@@ -150,83 +184,76 @@ def plot_team_win_pct(team_data):
     clutch_pct = team_data.get('WIN_PCT_clutch', 0)
     non_clutch_pct = team_data.get('WIN_PCT_non_clutch', 0)
     
-    data = {
-        'Game Type': ['Clutch Games', 'Non-Clutch Games'],
-        'Win Percentage': [clutch_pct, non_clutch_pct],
-        'Games Played': [team_data.get('GP_clutch', 0), team_data.get('GP_non_clutch', 0)]
-    }
-    df = pd.DataFrame(data)
-
-    fig = px.bar(
-        df, x='Game Type', y='Win Percentage', 
-        color='Game Type', 
-        color_discrete_map={'Clutch Games': NBA_RED, 'Non-Clutch Games': NBA_GRAY},
-        text_auto='.1%',
-        hover_data=['Games Played']
-    )
+    fig = go.Figure(data=[{
+        'type': "bar",
+        'x': ['Clutch Games', 'Non-Clutch Games'],
+        'y': [clutch_pct, non_clutch_pct],
+        'marker': {'color': [NBA_RED, NBA_GRAY]},
+        'texttemplate': "%{y:.1%}",
+        'customdata': [[team_data.get('GP_clutch', 0)], [team_data.get('GP_non_clutch', 0)]],
+        'hovertemplate': "Game Type=%{x}<br>Win Percentage=%{y}<br>Games Played=%{customdata[0]}<extra></extra>"
+    }])
     fig.update_layout(yaxis_range=[0,1], showlegend=False, yaxis_title="Win Percentage", xaxis_title=None)
     fig = _format_fig(fig, f"{team_data.get('TEAM_NAME')} - Win % (Clutch vs. Non-Clutch)")
     return fig
 
+@cache_figure
 def plot_simulation_results(old_stats, new_stats):
     """
     Displays the results of the simulation as a grouped bar chart.
     """
-    df = pd.DataFrame([old_stats, new_stats], index=['Current', 'Simulated']).T.reset_index()
-    df.columns = ['Metric', 'Current', 'Simulated']
-    df_melted = df.melt(id_vars='Metric', var_name='Scenario', value_name='Value')
-
-    fig = px.bar(
-        df_melted, 
-        x='Metric', 
-        y='Value', 
-        color='Scenario', 
-        barmode='group',
-        color_discrete_map={'Current': NBA_GRAY, 'Simulated': NBA_BLUE},
-        text_auto='.2f'
-    )
+    metrics = list(old_stats)
+    traces = [
+        {
+            'type': "bar",
+            'name': scenario,
+            'x': metrics,
+            'y': np.array([stats[m] for m in metrics]),
+            'marker': {'color': color},
+            'texttemplate': "%{y:.2f}",
+            'hovertemplate': f"Scenario={scenario}<br>Metric=%{{x}}<br>Value=%{{y}}<extra></extra>"
+        }
+        for scenario, stats, color in (('Current', old_stats, NBA_GRAY), ('Simulated', new_stats, NBA_BLUE))
+    ]
+    fig = go.Figure(data=traces, layout={'barmode': "group", 'legend': {'title': {'text': "Scenario"}}})
     fig = _format_fig(fig, "Simulation Results: Current vs. Simulated")
     fig.update_layout(xaxis_title=None, yaxis_title="Value")
     return fig
 
-def plot_model_feature_importance(ensemble_model, feature_names):
+@st.cache_resource(max_entries=256, show_spinner=False)
+def plot_model_feature_importance(_ensemble_model, feature_names, model_version):
     """
     Plots feature importances for the ensemble predictive model.
+    The ensemble is not hashed; model_version (its 'version' from train_model) keys the cache.
     """
-    if ensemble_model is None or 'models' not in ensemble_model:
+    if _ensemble_model is None or 'models' not in _ensemble_model:
         return go.Figure().update_layout(title="Model not available for feature importance.")
     
     # Get selected features from the feature selector
-    selected_mask = ensemble_model['selector'].get_support()
-    selected_features = [feature_names[i] for i in range(len(feature_names)) if selected_mask[i]]
-    
-    # Calculate weighted feature importance from ensemble
-    total_importance = None
+    selected_features = np.asarray(feature_names)[_ensemble_model['selector'].get_support()].tolist()
     
-    for name, model in ensemble_model['models'].items():
-        if hasattr(model, 'feature_importances_'):
-            importances = model.feature_importances_
-        elif hasattr(model, 'coef_'):
-            importances = abs(model.coef_)  # Use absolute values for Ridge
-        else:
-            continue
-            
-        # Weight by ensemble weight
-        weighted_importance = importances * ensemble_model['weights'][name]
-        
-        if total_importance is None:
-            total_importance = weighted_importance
-        else:
-            total_importance += weighted_importance
+    # Weighted feature importance, computed once when the ensemble is trained
+    total_importance = _ensemble_model.get('feature_importance')
     
     if total_importance is None:
         return go.Figure().update_layout(title="No feature importances available.")
         
-    imp_df = pd.DataFrame({'Feature': selected_features, 'Importance': total_importance})
-    imp_df = imp_df.sort_values(by='Importance', ascending=False).head(10)
+    # Top 10 by importance: partition, then order only those
+    k = min(10, total_importance.size)
+    top_idx = np.argpartition(-total_importance, k - 1)[:k]
+    top_idx = top_idx[np.argsort(-total_importance[top_idx], kind='stable')]
     
-    fig = px.bar(imp_df, x='Importance', y='Feature', orientation='h', 
-                 color_discrete_sequence=[NBA_BLUE])
+    fig = go.Figure(
+        data=[{
+            'type': "bar",
+            'orientation': "h",
+            'x': total_importance[top_idx],
+            'y': np.asarray(selected_features)[top_idx],
+            'marker': {'color': NBA_BLUE},
+            'hovertemplate': "Importance=%{x}<br>Feature=%{y}<extra></extra>"
+        }],
+        layout={'xaxis': {'title': {'text': "Importance"}}, 'yaxis': {'title': {'text': "Feature"}}}
+    )
     fig = _format_fig(fig, "Top 10 Predictor Features for Next-Season CPI (Ensemble Model)")
     fig.update_layout(yaxis=dict(autorange="reversed"))
     return fig
\ No newline at end of file
@@ -3,8 +3,10 @@ import pandas as pd
 from modules.utils import (
     set_page_config, 
     inject_custom_css, 
-    load_data, 
-    get_season_data,
+    load_season_data,
+    select_season,
+    get_team_player_positions,
+    gradient_css,
     METRIC_NAME_MAP
 )
 from modules.visualizations import plot_team_win_pct
@@ -12,12 +14,11 @@ from modules.visualizations import plot_team_win_pct
 set_page_config()
 inject_custom_css()
 
-player_df, team_df = load_data()
-if player_df is None:
+selected_season = select_season()
+player_df_season, team_df_season = load_season_data(selected_season)
+if player_df_season is None:
     st.stop()
 
-player_df_season, team_df_season, selected_season = get_season_data(player_df, team_df)
-
 st.header("Team Clutch Profile")
 st.markdown("Analyze how teams perform in clutch-game situations.")
 
@@ -46,11 +47,6 @@ else:
     st.markdown("---")
     
     st.subheader(f"Top 5 Clutch Players for {selected_team} (min. 5 clutch GP)")
-    team_players = player_df_season[
-        (player_df_season['TEAM_NAME'] == selected_team) &
-        (player_df_season['GP_clutch'] >= 5)
-    ].nlargest(5, 'CPI')
-    
     display_cols = {
         'PLAYER_NAME': 'Player',
         'CPI': 'CPI',
@@ -59,24 +55,19 @@ else:
         'FG_PCT_clutch': 'Clutch FG%',
         'FG_PCT_diff': 'FG% Differential'
     }
-    team_players_display = team_players[display_cols.keys()].rename(columns=display_cols)
+    team_positions = get_team_player_positions(player_df_season, selected_season)
+    team_rows = player_df_season.iloc[team_positions.get(selected_team, [])]
+    team_players = team_rows.loc[team_rows['GP_clutch'] >= 5, list(display_cols)].nlargest(5, 'CPI')
+    team_players_display = team_players.rename(columns=display_cols)
 
-    # Apply styling with fallback for deployment
-    try:
-        styled_team_df = team_players_display.style.format({
-            'CPI': '{:.3f}', 
-            'Clutch FG%': '{:.1%}', 
-            'FG% Differential': '{:+.1%}'
-        }).background_gradient(cmap='Greens', subset=['CPI'])
-    except ImportError:
-        # Fallback styling without background_gradient if matplotlib is not available
-        styled_team_df = team_players_display.style.format({
-            'CPI': '{:.3f}', 
-            'Clutch FG%': '{:.1%}', 
-            'FG% Differential': '{:+.1%}'
-        })
+    styled_team_df = team_players_display.style.format({
+        'CPI': '{:.3f}', 
+        'Clutch FG%': '{:.1%}', 
+        'FG% Differential': '{:+.1%}'
+    }).apply(gradient_css, subset=['CPI'])
 
     st.dataframe(
         styled_team_df,
-        width='stretch'
+        width='stretch',
+        hide_index=True
     )
\ No newline at end of file
@@ -1,10 +1,13 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 from modules.utils import (
     set_page_config, 
     inject_custom_css, 
-    load_data, 
-    get_season_data, 
+    load_season_data,
+    load_player_index,
+    list_players,
+    select_season,
     METRIC_NAME_MAP,
     generate_comparison_report_html
 )
@@ -14,27 +17,26 @@ from modules.analytics import get_player_profile
 set_page_config()
 inject_custom_css()
 
-player_df, team_df = load_data()
-if player_df is None:
+selected_season = select_season()
+player_df_season, team_df_season = load_season_data(selected_season)
+if player_df_season is None:
     st.stop()
 
-player_df_season, team_df_season, selected_season = get_season_data(player_df, team_df)
-
 st.header("Player Clutch Comparison")
 st.markdown(f"Compare two players head-to-head on their **{selected_season}** clutch performance.")
 
-player_list = sorted(player_df_season['PLAYER_NAME'].unique())
+player_list, name_index = list_players(selected_season)
 
 # Default to LeBron James and another star player for interesting comparison
 default_p1_index = 0
 default_p2_index = 1
 
-if 'LeBron James' in player_list:
-    default_p1_index = player_list.index('LeBron James')
+if 'LeBron James' in name_index:
+    default_p1_index = name_index['LeBron James']
     notable_players = ['Stephen Curry', 'Kevin Durant', 'Giannis Antetokounmpo', 'Kawhi Leonard', 'Chris Paul']
     for notable in notable_players:
-        if notable in player_list and notable != 'LeBron James':
-            default_p2_index = player_list.index(notable)
+        if notable in name_index and notable != 'LeBron James':
+            default_p2_index = name_index[notable]
             break
     else:
         default_p2_index = 1 if len(player_list) > 1 else 0
@@ -45,8 +47,8 @@ with col1:
 with col2:
     p2_name = st.selectbox("Select Player 2", player_list, index=default_p2_index)
 
-p1_data = get_player_profile(player_df_season, p1_name, selected_season)
-p2_data = get_player_profile(player_df_season, p2_name, selected_season)
+p1_data = get_player_profile(player_df_season, p1_name, selected_season, load_player_index(selected_season))
+p2_data = get_player_profile(player_df_season, p2_name, selected_season, load_player_index(selected_season))
 
 if p1_data is None or p2_data is None:
     st.warning("Please select two valid players.")
@@ -68,12 +70,13 @@ metrics_to_compare = [
     'CPI', 'GP_clutch', 'PPG_clutch', 'FG_PCT_clutch', 'FG_PCT_diff',
     'AST_TO_RATIO_clutch', 'PLUS_MINUS_PER_GAME_clutch'
 ]
-p1_stats = p1_data[metrics_to_compare]
-p2_stats = p2_data[metrics_to_compare]
+compare_values = np.column_stack([
+    p1_data[metrics_to_compare].to_numpy(dtype=float),
+    p2_data[metrics_to_compare].to_numpy(dtype=float)
+])
 
-compare_df = pd.DataFrame([p1_stats, p2_stats], index=[p1_name, p2_name]).T
-compare_df = compare_df.rename_axis("Metric").reset_index()
-compare_df['Metric'] = compare_df['Metric'].map(METRIC_NAME_MAP).fillna(compare_df['Metric'])
+compare_df = pd.DataFrame(compare_values, columns=[p1_name, p2_name])
+compare_df.insert(0, 'Metric', [METRIC_NAME_MAP.get(m, m) for m in metrics_to_compare])
 
 st.dataframe(
     compare_df.style.format({p1_name: '{:.3f}', p2_name: '{:.3f}'}),
@@ -89,10 +92,10 @@ with col1:
 with col2:
     st.write("")
 with col3:
-    report_html = generate_comparison_report_html(p1_data, p2_data, selected_season)
+    # The report is only rendered when the button is clicked
     st.download_button(
         label="📄 Download Report",
-        data=report_html,
+        data=lambda: generate_comparison_report_html(p1_data, p2_data, selected_season),
         file_name=f"{p1_name.replace(' ', '_')}_vs_{p2_name.replace(' ', '_')}_comparison_{selected_season}.html",
         mime="text/html",
         use_container_width=True
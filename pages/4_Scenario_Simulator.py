@@ -3,8 +3,11 @@ import pandas as pd
 from modules.utils import (
     set_page_config, 
     inject_custom_css, 
-    load_data, 
-    get_season_data
+    load_season_data,
+    load_player_index,
+    list_players,
+    select_season,
+    get_default_player_index
 )
 from modules.visualizations import plot_simulation_results
 from modules.analytics import get_player_profile, run_simulation
@@ -12,30 +15,12 @@ from modules.analytics import get_player_profile, run_simulation
 set_page_config()
 inject_custom_css()
 
-player_df, team_df = load_data()
-if player_df is None:
-    st.stop()
-
-player_df_season, team_df_season, selected_season = get_season_data(player_df, team_df)
-
-st.header("Scenario Simulator")
-st.markdown("What if a player took more shots in clutch situations? This tool simulates the potential impact on their key stats.")
-
-player_list = sorted(player_df_season['PLAYER_NAME'].unique())
-
-default_index = 0
-if 'LeBron James' in player_list:
-    default_index = player_list.index('LeBron James')
-
-selected_player = st.selectbox("Select Player", player_list, index=default_index)
-
-player_data = get_player_profile(player_df_season, selected_player, selected_season)
-
-if player_data is None:
-    st.warning(f"No data available for {selected_player} in {selected_season}.")
-else:
-    st.subheader(f"Simulate for {selected_player}")
-    
+@st.fragment
+def simulation_panel(player_data):
+    """
+    Shot-volume slider and its results. As a fragment, dragging the slider
+    reruns only this block.
+    """
     shot_increase = st.slider(
         "Increase in Clutch Field Goal Attempts (FGA) %",
         min_value=-50,
@@ -65,4 +50,27 @@ else:
     * Calculates new Points based on the additional {shot_increase}% shot attempts.
     * Estimates a corresponding increase in turnovers based on the player's turnover-per-shot rate, with a small elasticity factor for increased usage.
     * Assists per game are held constant.
-    """)
\ No newline at end of file
+    """)
+
+selected_season = select_season()
+player_df_season, team_df_season = load_season_data(selected_season)
+if player_df_season is None:
+    st.stop()
+
+st.header("Scenario Simulator")
+st.markdown("What if a player took more shots in clutch situations? This tool simulates the potential impact on their key stats.")
+
+player_list, name_index = list_players(selected_season)
+
+default_index = get_default_player_index(player_list, name_index=name_index)
+
+selected_player = st.selectbox("Select Player", player_list, index=default_index)
+
+player_data = get_player_profile(player_df_season, selected_player, selected_season, load_player_index(selected_season))
+
+if player_data is None:
+    st.warning(f"No data available for {selected_player} in {selected_season}.")
+else:
+    st.subheader(f"Simulate for {selected_player}")
+    
+    simulation_panel(player_data)
\ No newline at end of file
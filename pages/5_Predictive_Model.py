@@ -4,7 +4,8 @@ from modules.utils import (
     set_page_config, 
     inject_custom_css, 
     load_data, 
-    get_season_data
+    get_season_data,
+    gradient_css
 )
 from modules.models import get_model_data, train_model, get_predictions
 from modules.visualizations import plot_model_feature_importance
@@ -38,7 +39,7 @@ col2.metric("Testing R²", f"{r2:.3f}", help="R² score on test data - how well
 col3.metric("Mean Absolute Error", f"{mae:.3f}", help="The average absolute difference between predicted and actual CPI values.")
 col4.metric("Root Mean Squared Error", f"{rmse:.3f}", help="Square root of the mean squared error - penalizes larger prediction errors more heavily.")
 
-fig_imp = plot_model_feature_importance(model, features)
+fig_imp = plot_model_feature_importance(model, features, model['version'])
 st.plotly_chart(fig_imp, use_container_width=True)
 
 st.markdown("---")
@@ -46,21 +47,14 @@ st.markdown("---")
 st.header(f"Predicted Top 20 Clutch Players for {selected_season + 1}")
 st.markdown(f"Based on player performance from the **{selected_season}** season.")
 
-predictions_df = get_predictions(player_df, selected_season, model, scaler, features)
+predictions_df = get_predictions(player_df, selected_season, model, scaler, features, model['version'])
 
 if predictions_df.empty:
     st.warning(f"No players in the {selected_season} season had the complete data required for prediction.")
 else:
-    # Apply styling with fallback for deployment
-    try:
-        styled_predictions = predictions_df.head(20).style.format({
-            f'Predicted CPI ({selected_season + 1})': '{:.3f}'
-        }).background_gradient(cmap='Greens', subset=[f'Predicted CPI ({selected_season + 1})'])
-    except ImportError:
-        # Fallback styling without background_gradient if matplotlib is not available
-        styled_predictions = predictions_df.head(20).style.format({
-            f'Predicted CPI ({selected_season + 1})': '{:.3f}'
-        })
+    styled_predictions = predictions_df.head(20).style.format({
+        f'Predicted CPI ({selected_season + 1})': '{:.3f}'
+    }).apply(gradient_css, subset=[f'Predicted CPI ({selected_season + 1})'])
     
     st.dataframe(
         styled_predictions,